@@ -5,6 +5,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 # Configuración de logging
@@ -83,8 +84,7 @@ class BalanceSheetConsultaUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent.parent / "captop.db"
-        self.model = BalanceSheetModel(db_file)
+        self.model = BalanceSheetModel(DB_FILE)
         
         # Inicializar variables
         self.label_vars = {}
@@ -5,6 +5,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 # Configuración de logging
@@ -112,8 +113,7 @@ class CashFlowConsultaUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent.parent / "captop.db"
-        self.model = CashFlowModel(db_file)
+        self.model = CashFlowModel(DB_FILE)
         
         # Inicializar variables
         self.display_vars = {}
@@ -4,6 +4,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -62,7 +63,7 @@ class ConsultaHomeUI(tk.Toplevel):
         self.company_name = company_name
         self.period = period
         
-        self.model = BusinessGameModel(Path(__file__).parent.parent.parent / "captop.db")
+        self.model = BusinessGameModel(DB_FILE)
         
         self.entry_vars = {}
         self.countries = ["Argentina", "Brasil", "Chile", "Colombia", "Mexico"]
@@ -4,12 +4,12 @@ import json
 import sqlite3
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Configuración y Constantes
 # ────────────────────────────────────────────────────────────────────────────────
 
-DB_FILE = Path(__file__).parent.parent.parent / "captop.db"
 
 # Textos para internacionalización
 TEXTS = {
@@ -3,10 +3,9 @@ from tkinter import ttk
 from tkinter import messagebox
 import json
 import sqlite3
-from pathlib import Path
+from Interfaces.db import DB_FILE
 
 # --- Configuración de la Base de Datos ---
-DB_FILE = Path(__file__).parent.parent.parent / "captop.db"
 
 def get_connection():
     """Establece y devuelve una conexión a la base de datos."""
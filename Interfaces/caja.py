@@ -5,6 +5,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 # Configuración de logging
@@ -145,8 +146,7 @@ class CashFlowUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = CashFlowModel(db_file)
+        self.model = CashFlowModel(DB_FILE)
         
         # Inicializar variables
         self.entry_vars = {}
@@ -5,6 +5,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 # Configuración de logging
@@ -148,8 +149,7 @@ class PreviousPeriodDataUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = PreviousPeriodModel(db_file)
+        self.model = PreviousPeriodModel(DB_FILE)
         
         # Inicializar variables
         self.entry_vars = {}
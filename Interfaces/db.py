@@ -0,0 +1,308 @@
+# db.py
+import json
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Any, Tuple, TypeVar
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa json de la biblioteca estándar
+    orjson = None
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Configuración y Constantes
+# ────────────────────────────────────────────────────────────────────────────────
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = Path(__file__).parent.parent / "captop.db"
+
+# product_type por omisión de la tabla decision (el DEFAULT de la columna).
+# Las ventanas sin producto propio (publicidad, resumen, préstamos...) guardan
+# y leen sus secciones en esa fila, la misma del producto PROFESSIONAL.
+DEFAULT_PRODUCT_TYPE = "professional"
+
+# Tabla decision con su clave completa; {table} permite crear la copia que usa
+# la migración de init_schema.
+DECISION_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        company_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        product_type TEXT NOT NULL DEFAULT '{DEFAULT_PRODUCT_TYPE}',
+        payload TEXT NOT NULL,
+        PRIMARY KEY (company_id, period, product_type)
+    ) WITHOUT ROWID;
+"""
+
+# Versión del esquema que deja init_schema (se guarda en PRAGMA user_version)
+_SCHEMA_VERSION = 1
+
+# Payload de decision de un producto. Las ventanas sin producto propio leen la
+# fila DEFAULT_PRODUCT_TYPE, donde las versiones anteriores guardaban sus secciones.
+SQL_LOAD_DECISION = "SELECT payload FROM decision WHERE company_id = ? AND period = ? AND product_type = ?"
+
+# Sentencias del manejador; con texto constante SQLite reutiliza la sentencia preparada.
+# Las PRIMARY KEY de decision, mr_values y financial_statement ya indexan estas
+# búsquedas; los upserts actualizan la fila en su lugar en vez de borrarla y
+# reinsertarla como REPLACE.
+_SQL_SAVE_MR_VALUE = (
+    "INSERT INTO mr_values (company_id, period, field, value) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (company_id, period, field) DO UPDATE SET value = excluded.value"
+)
+_SQL_LOAD_MR_VALUES = "SELECT field, value FROM mr_values WHERE company_id = ? AND period = ?"
+_SQL_SAVE_FINANCIAL = (
+    "INSERT INTO financial_statement (company_id, period, type, data) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (company_id, period, type) DO UPDATE SET data = excluded.data"
+)
+_SQL_LOAD_FINANCIAL = "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?"
+
+# Una fila por campo de la investigación de mercado. Con afinidad REAL, el
+# texto numérico ingresado se guarda como número y el resto queda como texto.
+_MR_VALUES_DDL = """
+    CREATE TABLE IF NOT EXISTS mr_values (
+        company_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (company_id, period, field)
+    ) WITHOUT ROWID;
+"""
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Utilidades compartidas por los módulos de Interfaces
+# ────────────────────────────────────────────────────────────────────────────────
+
+def dumps(data: Any) -> str:
+    """Serializa a JSON compacto en UTF-8, para las columnas TEXT de la base."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(payload) -> Any:
+    """Decodifica el JSON guardado por dumps (o por versiones anteriores)."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Archivos en los que ya se pidió journal_mode=WAL durante este proceso
+_wal_files = set()
+
+
+def connect(db_file: Path, row_factory=None, **kwargs) -> sqlite3.Connection:
+    """Abre una conexión SQLite con los PRAGMA comunes.
+
+    Las filas son tuplas salvo que se pida row_factory (p. ej. sqlite3.Row);
+    kwargs se pasan a sqlite3.connect. journal_mode=WAL queda guardado en el
+    archivo (junto a captop.db aparecen captop.db-wal y captop.db-shm), por eso
+    se pide una sola vez por archivo; el resto de los PRAGMA es por conexión.
+    """
+    conn = sqlite3.connect(db_file, **kwargs)
+    conn.row_factory = row_factory
+    if db_file not in _wal_files:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_files.add(db_file)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-64000")
+    return conn
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    """Lleva la tabla decision a la clave (company_id, period, product_type).
+
+    main.py la llama al abrir la base, antes de cualquier ventana, así que las
+    consultas de las ventanas pueden filtrar por product_type sin comprobarlo.
+    """
+    cursor = conn.cursor()
+    # El esquema ya quedó al día en una apertura anterior de la base
+    if cursor.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    
+    # Verificar si la tabla decision ya existe
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='decision';")
+    row = cursor.fetchone()
+    
+    if row is None:
+        # Crear la tabla con el campo product_type, agrupada por su clave primaria
+        cursor.execute(DECISION_DDL.format(table="decision"))
+    elif "WITHOUT ROWID" not in row[0].upper():
+        # Verificar si la columna product_type ya existe
+        cursor.execute("PRAGMA table_info(decision)")
+        column_names = [column[1] for column in cursor.fetchall()]
+        
+        # Crear una tabla temporal con la nueva estructura (WITHOUT ROWID: el
+        # payload queda dentro del índice de la clave primaria)
+        cursor.execute(DECISION_DDL.format(table="decision_temp"))
+        
+        # Copiar datos de la tabla original a la temporal
+        if 'product_type' in column_names:
+            cursor.execute("""
+                INSERT INTO decision_temp (company_id, period, product_type, payload)
+                SELECT company_id, period, product_type, payload FROM decision;
+            """)
+        else:
+            cursor.execute("""
+                INSERT INTO decision_temp (company_id, period, payload)
+                SELECT company_id, period, payload FROM decision;
+            """)
+        
+        # Eliminar la tabla original
+        cursor.execute("DROP TABLE decision;")
+        
+        # Renombrar la tabla temporal
+        cursor.execute("ALTER TABLE decision_temp RENAME TO decision;")
+    
+    cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    conn.commit()
+
+
+def optimize_connection(conn: Optional[sqlite3.Connection]) -> None:
+    """Actualiza las estadísticas del planificador si hace falta (casi siempre no hace nada).
+
+    Nunca falla: se llama al cerrar ventanas y no debe impedirlo.
+    """
+    if conn is not None:
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+
+
+def close_connection(conn: Optional[sqlite3.Connection]) -> None:
+    """Cierra conn, si está abierta, pasando antes por optimize_connection."""
+    if conn is not None:
+        optimize_connection(conn)
+        conn.close()
+
+
+_T = TypeVar("_T")
+
+
+def shared_instance(parent_app, attr: str, factory: Callable[[], _T]) -> _T:
+    """Devuelve getattr(parent_app, attr), creándolo con factory() la primera vez.
+
+    Así todas las ventanas de la aplicación usan la misma instancia, con su
+    conexión, sus PRAGMA y su caché de sentencias, durante la sesión.
+    """
+    instance = getattr(parent_app, attr, None)
+    if instance is None:
+        instance = factory()
+        setattr(parent_app, attr, instance)
+    return instance
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Manejador compartido
+# ────────────────────────────────────────────────────────────────────────────────
+
+class DatabaseManager:
+    """Manejador de la base de datos encapsulando todas las operaciones SQL."""
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        # Una sola conexión, abierta en el primer uso y reutilizada
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        """Devuelve la conexión SQLite (filas accesibles por nombre), abriéndola la primera vez."""
+        if self._conn is None:
+            self._conn = self._open_connection()
+        return self._conn
+
+    def close(self):
+        """Cierra la conexión si está abierta."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _open_connection(self):
+        # La conexión se usa desde el hilo de Tk y desde hilos de lectura; _lock serializa
+        # Sin transacciones implícitas: cada escritura abre la suya en _write_many
+        conn = connect(self.db_file, row_factory=sqlite3.Row,
+                       check_same_thread=False, isolation_level=None)
+        conn.execute(_MR_VALUES_DDL)
+        return conn
+
+    def _write_many(self, sql: str, rows: Iterable[Tuple]) -> None:
+        """Ejecuta sql para todas las filas en una sola transacción explícita.
+
+        Se llama con _lock tomado; si algo falla no queda escrita ninguna fila.
+        """
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def save_market_research(self, company_id: int, period: int, values: Dict[str, str]) -> bool:
+        """Guarda los campos de investigación de mercado en mr_values."""
+        with self._lock:
+            try:
+                self._write_many(
+                    _SQL_SAVE_MR_VALUE,
+                    ((company_id, period, field, value) for field, value in values.items())
+                )
+                return True
+            except sqlite3.Error:
+                return False
+
+    def load_market_research(self, company_id: int, period: int) -> Optional[Dict[str, Any]]:
+        """Carga los campos de investigación de mercado."""
+        with self._lock:
+            conn = self.get_connection()
+            rows = conn.execute(_SQL_LOAD_MR_VALUES, (company_id, period)).fetchall()
+            if rows:
+                return {field: value for field, value in rows}
+            
+            # Datos guardados antes de existir mr_values
+            row = conn.execute(SQL_LOAD_DECISION, (company_id, period, DEFAULT_PRODUCT_TYPE)).fetchone()
+            if row is None:
+                return None
+            return loads(row["payload"]).get("market_research")
+
+    def save_financial(self, company_id: int, period: int, type_: str, data: Dict[str, Any]) -> bool:
+        """Guarda los datos de tipo type_ en financial_statement."""
+        return self.save_many_financial([(company_id, period, type_, data)])
+
+    def save_many_financial(self, statements: Iterable[Tuple[int, int, str, Dict[str, Any]]]) -> bool:
+        """Guarda varios (company_id, period, type_, data) en financial_statement de una vez."""
+        with self._lock:
+            try:
+                self._write_many(
+                    _SQL_SAVE_FINANCIAL,
+                    [(cid, period, type_, dumps(data)) for cid, period, type_, data in statements]
+                )
+                return True
+            except Exception as e:
+                logger.error(f"Error saving financial statements: {str(e)}")
+                return False
+
+    def load_financial(self, company_id: int, period: int, type_: str) -> Optional[Dict[str, Any]]:
+        """Carga los datos de tipo type_ desde financial_statement."""
+        try:
+            with self._lock:
+                cursor = self.get_connection().execute(_SQL_LOAD_FINANCIAL, (company_id, period, type_))
+                row = cursor.fetchone()
+                return loads(row["data"]) if row else None
+        except Exception as e:
+            logger.error(f"Error loading {type_} data: {str(e)}")
+            return None
+
+
+_shared: Optional[DatabaseManager] = None
+
+
+def get_shared() -> DatabaseManager:
+    """Devuelve el manejador común a todas las ventanas, creándolo la primera vez."""
+    global _shared
+    if _shared is None:
+        _shared = DatabaseManager(DB_FILE)
+    return _shared
@@ -5,6 +5,7 @@ from pathlib import Path
 import json
 import logging
 from typing import Dict, Any, Optional
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 # Configuración de logging
@@ -124,8 +125,7 @@ class DatosFisicosInventarioUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = DatosFisicosInventarioModel(db_file)
+        self.model = DatosFisicosInventarioModel(DB_FILE)
         
         # Inicializar variables
         self.entry_vars = {}
@@ -1,93 +1,173 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
 from Interfaces.translations import tr
+from Interfaces.widgets import configure_columns
+from Interfaces.db import DB_FILE, DEFAULT_PRODUCT_TYPE, SQL_LOAD_DECISION, connect, dumps, loads, shared_instance
+
+logger = logging.getLogger(__name__)
+
+
+
+def _to_float(value: str) -> Any:
+    """Convierte el texto de una celda a float, dejando el texto si no es numérico."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+# Consultas del modelo. Se definen una sola vez para que cada llamada use el
+# mismo texto SQL y encuentre la sentencia ya preparada en la caché de la conexión.
+_SQL_SELECT_COMPANIES = "SELECT id, name, current_period FROM company ORDER BY name"
+_SQL_SELECT_COMPANY = "SELECT * FROM company WHERE id = ?"
+_SQL_INSERT_COMPANY = "INSERT INTO company (name, cash_usd, current_period, reporting_currency_exchange_rate) VALUES (?, ?, ?, ?)"
+_SQL_SAVE_DECISION = "REPLACE INTO decision (company_id, period, product_type, payload) VALUES (?, ?, ?, ?)"
+_SQL_INCREMENT_PERIOD = "UPDATE company SET current_period = current_period + 1 WHERE id = ?"
+_SQL_ADVANCE_PERIOD = _SQL_INCREMENT_PERIOD + " RETURNING current_period"
+_SQL_SAVE_CELL = "INSERT OR REPLACE INTO decision_cell VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_SQL_LOAD_CELLS = ("SELECT section, row, country, sub, value FROM decision_cell "
+                   "WHERE company_id = ? AND period = ? AND product_type = ?")
+
+# Una fila por celda de ProductUI, indexada por posición dentro de SECTIONS.
+_DECISION_CELL_DDL = """
+    CREATE TABLE IF NOT EXISTS decision_cell (
+        company_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        product_type TEXT NOT NULL,
+        section INTEGER NOT NULL,
+        row INTEGER NOT NULL,
+        country INTEGER NOT NULL,
+        sub INTEGER NOT NULL,
+        value REAL,
+        PRIMARY KEY (company_id, period, product_type, section, row, country, sub)
+    ) WITHOUT ROWID;
+"""
+
+
+def _row_tokens(rows, chars=None):
+    """Empareja cada etiqueta de fila con el texto limpio que se usa en la clave."""
+    table = str.maketrans(chars) if chars else None
+    return tuple((label, label.translate(table) if table else label) for label in rows)
+
+
+COUNTRIES = ("Argentina", "Brasil", "Chile", "Colombia", "Mexico")
+
+# Secciones de decisiones de ProductUI. Cada una es una grilla filas x países
+# (x sub-columnas); key_fmt define la clave con la que se guarda cada celda.
+SECTIONS = (
+    {
+        "title": "PRECIOS Y CONDICIÓN DE CRÉDITO",
+        "rows": _row_tokens(("Condición Crédito 1", "Condición Crédito 2", "Condición Crédito 3")),
+        "sub_headers": ("TD", "ES"),
+        "key_fmt": "price_credit_cond{r}_{country}_{sub}",
+    },
+    {
+        "title": "PRODUCCIÓN - TRANSPORTE",
+        "rows": _row_tokens(("Produc. Ordenada en el per", "Compras/vtas/castigos", "Stock Disponible para Venta",
+                             "Despacho Aéreo: Origen", "Despacho Aéreo: Destino"), {' ': '_', '/': '_', '.': None}),
+        "key_fmt": "prod_trans_{row}_{country}",
+    },
+    {
+        "title": "COMPRA DE PLANTAS DEL PERÍODO",
+        "rows": _row_tokens(("Condicion de Compra",)),
+        "key_fmt": "plant_purchase_condition_{country}",
+        "boxed_header": True,
+    },
+    {
+        "title": "Control de Materias Primas",
+        "rows": _row_tokens(("KITS - Consumo en Unidades", "Compra en Unidades", "PPA - Consumo en Unidades",
+                             "Compra en Unidades", "Condicion de compra"), {' ': '_', '/': '_', '.': None, ':': None}),
+        "key_fmt": "raw_materials_{row}_{country}",
+    },
+    {
+        "title": "PUNTOS DE VENTAS",
+        "rows": _row_tokens(("N° Puntos Venta a Atender TD", "N° Puntos Venta a Atender ES",
+                             "N° Vendedores Contratados", "N° Vendedores en Funciones"), {' ': '_', '°': 'N', '.': None}),
+        "key_fmt": "sales_points_{row}_{country}",
+    },
+    {
+        "title": "Remuneración Variable Vendedores",
+        "rows": _row_tokens(("Remuneración variable vendedores (%)",), {' ': '_', '%': 'perc'}),
+        "key_fmt": "variable_comp_{row}_{country}",
+    },
+    {
+        "title": "PUBLICIDAD (Frecuencia)",
+        "rows": _row_tokens(("Revista PC Actualidad", "Diario Negocios y Economía", "Diario Sensacionalista",
+                             "Televisión Abierta", "Televisión Cable", "Circuito ABC1", "Circuito C2C3",
+                             "Radio Adulto Joven", "Radio Noticias", "Radio La TIERRA", "Portal Diario Electrónico"),
+                            {' ': '_', '.': None}),
+        "key_fmt": "advertising_freq_{row}_{country}",
+        "wrap_labels": True,
+    },
+    {
+        "title": "INVERSIONES - PROMOCIONES SIN PUBLICIDAD",
+        "rows": _row_tokens(("Condicion de Compra",)),
+        "key_fmt": "investment_condition_{country}",
+        "boxed_header": True,
+    },
+)
+
+
+def _cell_positions():
+    """Mapea cada clave de celda a su posición (section, row, country, sub)."""
+    positions = {}
+    for section_id, section in enumerate(SECTIONS):
+        subs = section.get("sub_headers") or (None,)
+        for row_id, (_, row_token) in enumerate(section["rows"]):
+            for country_id, country in enumerate(COUNTRIES):
+                for sub_id, sub in enumerate(subs):
+                    key = section["key_fmt"].format(r=row_id + 1, row=row_token, country=country, sub=sub)
+                    positions[key] = (section_id, row_id, country_id, sub_id)
+    return positions
+
+
+CELL_POSITIONS = _cell_positions()
+CELL_KEYS = {pos: key for key, pos in CELL_POSITIONS.items()}
 
 class BusinessGameModel:
     """Modelo para manejar los datos del juego de empresas."""
     
     def __init__(self, db_file: Path):
         self.db_file = db_file
+        # Una sola conexión, abierta en el primer uso y reutilizada
+        self._conn: Optional[sqlite3.Connection] = None
+        # Caché de get_companies(); se invalida cuando cambian las empresas
+        self._companies = None
         
     def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
+        if self._conn is None:
+            self._conn = connect(self.db_file, row_factory=sqlite3.Row)
+            # company y decision las deja al día main.py al abrir la base
+            self._conn.execute(_DECISION_CELL_DDL)
+        return self._conn
     
-    def init_schema(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS company (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    cash_usd REAL NOT NULL DEFAULT 0.0,
-                    current_period INTEGER NOT NULL DEFAULT 0,
-                    reporting_currency_exchange_rate REAL NOT NULL DEFAULT 950.0
-                );
-            """)
-            
-            # Verificar si la tabla decision ya existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='decision';")
-            table_exists = cursor.fetchone() is not None
-            
-            if not table_exists:
-                # Crear la tabla con el nuevo campo product_type
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS decision (
-                        company_id INTEGER NOT NULL,
-                        period INTEGER NOT NULL,
-                        product_type TEXT NOT NULL,
-                        payload TEXT NOT NULL,
-                        PRIMARY KEY (company_id, period, product_type)
-                    );
-                """)
-            else:
-                # Verificar si la columna product_type ya existe
-                cursor.execute("PRAGMA table_info(decision)")
-                columns = cursor.fetchall()
-                column_names = [column[1] for column in columns]
-                
-                if 'product_type' not in column_names:
-                    # Crear una tabla temporal con la nueva estructura
-                    cursor.execute("""
-                        CREATE TABLE decision_temp (
-                            company_id INTEGER NOT NULL,
-                            period INTEGER NOT NULL,
-                            product_type TEXT NOT NULL DEFAULT 'professional',
-                            payload TEXT NOT NULL,
-                            PRIMARY KEY (company_id, period, product_type)
-                        );
-                    """)
-                    
-                    # Copiar datos de la tabla original a la temporal
-                    cursor.execute("""
-                        INSERT INTO decision_temp (company_id, period, payload)
-                        SELECT company_id, period, payload FROM decision;
-                    """)
-                    
-                    # Eliminar la tabla original
-                    cursor.execute("DROP TABLE decision;")
-                    
-                    # Renombrar la tabla temporal
-                    cursor.execute("ALTER TABLE decision_temp RENAME TO decision;")
-            
-            conn.commit()
+    def close(self):
+        """Cierra la conexión si está abierta."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
             
     def get_companies(self) -> list:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name FROM company ORDER BY name")
-            return [(row["id"], row["name"]) for row in cursor.fetchall()]
+        if self._companies is None:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SQL_SELECT_COMPANIES)
+                self._companies = [(row["id"], row["name"], row["current_period"]) for row in cursor.fetchall()]
+        return self._companies
+
+    def invalidate_companies(self):
+        self._companies = None
     
     def get_company_info(self, company_id: int) -> Optional[Dict]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM company WHERE id = ?", (company_id,))
+            cursor.execute(_SQL_SELECT_COMPANY, (company_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
     
@@ -96,9 +176,10 @@ class BusinessGameModel:
             with self.get_connection() as conn:
                 cursor = conn.cursor()                
                 cursor.execute(
-                    "INSERT INTO company (name, cash_usd, current_period, reporting_currency_exchange_rate) VALUES (?, ?, ?, ?)",
+                    _SQL_INSERT_COMPANY,
                     (name, 1000000.0, int(tr("initial_period")), 950.0))
                 conn.commit()
+                self.invalidate_companies()
                 return True
         except sqlite3.IntegrityError:
             logger.error(f"Empresa ya existe: {name}")
@@ -107,43 +188,91 @@ class BusinessGameModel:
             logger.error(f"Error al crear empresa: {str(e)}")
             return False
     
-    def save_decisions(self, company_id: int, period: int, data: Dict, product_type: str = 'professional') -> bool:
+    def _write_decisions(self, conn, company_id: int, period: int, data: Dict, product_type: str):
+        # El payload JSON se mantiene porque lo leen las pantallas de consulta;
+        # ProductUI carga desde decision_cell.
+        conn.execute(
+            _SQL_SAVE_DECISION,
+            (company_id, period, product_type, dumps(data))
+        )
+        conn.executemany(
+            _SQL_SAVE_CELL,
+            [(company_id, period, product_type, *CELL_POSITIONS[key], value)
+             for key, value in data.items() if key in CELL_POSITIONS]
+        )
+
+    def save_decisions(self, company_id: int, period: int, data: Dict, product_type: str = DEFAULT_PRODUCT_TYPE) -> bool:
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "REPLACE INTO decision (company_id, period, product_type, payload) VALUES (?, ?, ?, ?)",
-                    (company_id, period, product_type, json.dumps(data))
-                )
+                self._write_decisions(conn, company_id, period, data, product_type)
                 conn.commit()
                 return True
         except Exception as e:
-            logging.error(f"Error al guardar decisiones: {str(e)}")
+            logger.error(f"Error al guardar decisiones: {str(e)}")
             return False
     
-    def load_decisions(self, company_id: int, period: int, product_type: str = 'professional') -> Optional[Dict]:
+    def load_decisions(self, company_id: int, period: int, product_type: str = DEFAULT_PRODUCT_TYPE) -> Optional[Dict]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(_SQL_LOAD_CELLS, (company_id, period, product_type))
+            cells = cursor.fetchall()
+            if cells:
+                return {CELL_KEYS[(s, r, c, sub)]: value for s, r, c, sub, value in cells
+                        if (s, r, c, sub) in CELL_KEYS}
+            
+            # Decisiones guardadas antes de existir decision_cell
             cursor.execute(
-                "SELECT payload FROM decision WHERE company_id = ? AND period = ? AND product_type = ?",
+                SQL_LOAD_DECISION,
                 (company_id, period, product_type)
             )
             row = cursor.fetchone()
-            return json.loads(row["payload"]) if row else None
+            return loads(row["payload"]) if row else None
 
     def increment_period(self, company_id: int) -> bool:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    "UPDATE company SET current_period = current_period + 1 WHERE id = ?",
+                    _SQL_INCREMENT_PERIOD,
                     (company_id,))
                 conn.commit()
+                self.invalidate_companies()
                 return True
         except Exception as e:
             logger.error(f"Error al incrementar período: {str(e)}")
             return False
 
+    def save_and_advance(self, company_id: int, period: int, data: Dict, product_type: str = DEFAULT_PRODUCT_TYPE) -> Optional[int]:
+        """Guarda las decisiones y avanza el período en una sola transacción.
+
+        Devuelve el nuevo período de la empresa, o None si algo falló (en ese
+        caso no queda guardado nada).
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_decisions(conn, company_id, period, data, product_type)
+                row = conn.execute(
+                    _SQL_ADVANCE_PERIOD,
+                    (company_id,)
+                ).fetchone()
+                if row is None:
+                    raise sqlite3.Error(f"Empresa no encontrada: {company_id}")
+                conn.execute("COMMIT")
+                self.invalidate_companies()
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return row["current_period"]
+        except Exception as e:
+            logger.error(f"Error al guardar decisiones y avanzar período: {str(e)}")
+            return None
+
+def shared_model(parent_app) -> BusinessGameModel:
+    """Devuelve el modelo de la aplicación, creándolo la primera vez."""
+    return shared_instance(parent_app, "business_game_model", lambda: BusinessGameModel(DB_FILE))
+
 class ProductUI(tk.Toplevel):
     """Interfaz base para productos."""
     
@@ -155,11 +284,10 @@ class ProductUI(tk.Toplevel):
         self.period = period
         self.product_type = product_type
         
-        self.model = BusinessGameModel(Path(__file__).parent.parent / "captop.db")
-        self.model.init_schema()
+        self.model = shared_model(parent_app)
         
-        self.entry_vars = {}
-        self.countries = ["Argentina", "Brasil", "Chile", "Colombia", "Mexico"]
+        self.entries = {}
+        self.countries = COUNTRIES
         
         self._setup_ui()
         self._load_initial_data()
@@ -173,8 +301,13 @@ class ProductUI(tk.Toplevel):
         self._create_scrollable_frame()
         self._create_header()
         self._create_company_selector()
-        self._create_main_sections()
+        # Contenedor de las secciones: se llena en _create_main_sections, que
+        # corre cuando la ventana ya está visible.
+        self.sections_frame = ttk.Frame(self.scrollable_frame)
+        self.sections_frame.pack(fill="x")
+        self._entry_items = ()
         self._create_action_buttons()
+        self.after_idle(self._create_main_sections)
     
     def _configure_styles(self):
         style = ttk.Style()
@@ -201,7 +334,7 @@ class ProductUI(tk.Toplevel):
         )
     
     def _create_scrollable_frame(self):
-        self.main_canvas = tk.Canvas(self, bg='#DCDAD5')
+        self.main_canvas = tk.Canvas(self, bg='#DCDAD5', highlightthickness=0, yscrollincrement=20)
 
         self.main_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.main_canvas.yview)
         self.scrollable_frame = ttk.Frame(self.main_canvas)
@@ -218,6 +351,17 @@ class ProductUI(tk.Toplevel):
 
         self.main_canvas.pack(side="left", fill="both", expand=True)
         self.main_scrollbar.pack(side="right", fill="y")
+
+        # La rueda del mouse desplaza el formulario desde cualquier widget de la ventana
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", self._on_mousewheel)
+        self.bind("<Button-5>", self._on_mousewheel)
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.main_canvas.yview_scroll(-1, "units")
+        elif event.num == 5 or event.delta < 0:
+            self.main_canvas.yview_scroll(1, "units")
     
     def _create_header(self):
         header_frame = ttk.Frame(self.scrollable_frame, padding=(15, 10))
@@ -247,57 +391,50 @@ class ProductUI(tk.Toplevel):
         company_period_frame.grid_columnconfigure(1, weight=1)
     
     def _create_main_sections(self):
-        self.create_price_credit_section()
-        self.create_production_transport_section()
-        self.create_plant_purchase_section()
-        self.create_raw_materials_section()
-        self.create_sales_points_section()
-        self.create_seller_compensation_section()
-        self.create_advertising_section()
-        self.create_investments_section()
+        if not self.winfo_exists():
+            return
+        for section in SECTIONS:
+            self._build_grid_section(**section)
+        self._entry_items = tuple(self.entries.items())
+        self.save_button.state(["!disabled"])
+
+        if self.company_combo.get():
+            self._load_data()
     
     def _create_action_buttons(self):
         button_frame = ttk.Frame(self.scrollable_frame, padding=(10, 10))
         button_frame.pack(fill="x", padx=10, pady=10)
-        button_frame.columnconfigure(0, weight=1)
-        button_frame.columnconfigure(1, weight=1)
-        button_frame.columnconfigure(2, weight=1)
+        configure_columns(button_frame, range(3))
 
-        ttk.Button(button_frame, text="Guardar Decisiones", command=self._save_data).grid(row=0, column=0, padx=5, pady=5, sticky='ew')
+        # Deshabilitado hasta que _create_main_sections construya las entradas
+        self.save_button = ttk.Button(button_frame, text="Guardar Decisiones", command=self._save_data, state="disabled")
+        self.save_button.grid(row=0, column=0, padx=5, pady=5, sticky='ew')
         ttk.Button(button_frame, text="Cargar Decisiones", command=self._load_data).grid(row=0, column=1, padx=5, pady=5, sticky='ew')
         ttk.Button(button_frame, text="Volver al Menú Principal", command=self._on_closing).grid(row=0, column=2, padx=5, pady=5, sticky='ew')
     
     def _load_initial_data(self):
         companies = self.model.get_companies()
-        self.company_combo['values'] = [name for _, name in companies]
+        # Ids y períodos alineados con los valores del combobox, para resolver la selección por índice
+        self._company_ids = [c_id for c_id, _, _ in companies]
+        self._company_periods = [period for _, _, period in companies]
+        by_id = {c_id: name for c_id, name, _ in companies}
+        self.company_combo['values'] = list(by_id.values())
         
-        if companies:
-            for c_id, name in companies:
-                if c_id == self.company_id:
-                    self.company_combo.set(name)
-                    self.company_var.set(name)
-                    self.period_var.set(str(self.period))
-                    break
-            
-            if self.company_combo.get():
-                self._load_data()
+        name = by_id.get(self.company_id)
+        if name is not None:
+            self.company_combo.set(name)
+            self.company_var.set(name)
+            self.period_var.set(str(self.period))
     
     def _on_company_selected(self, event=None):
-        company_name = self.company_var.get()
-        if not company_name:
+        idx = self.company_combo.current()
+        if idx < 0:
             return
+        self.company_id = self._company_ids[idx]
         
-        companies = self.model.get_companies()
-        for c_id, name in companies:
-            if name == company_name:
-                self.company_id = c_id
-                break
-        
-        company_info = self.model.get_company_info(self.company_id)
-        if company_info:
-            self.period = company_info['current_period']
-            self.period_var.set(str(self.period))
-            self.display_period_var.set(f"PERIODO ACTUAL: {self.period}")
+        self.period = self._company_periods[idx]
+        self.period_var.set(str(self.period))
+        self.display_period_var.set(f"PERIODO ACTUAL: {self.period}")
         
         self._load_data()
     
@@ -306,242 +443,76 @@ class ProductUI(tk.Toplevel):
             messagebox.showwarning("Guardar", "Seleccione una empresa primero")
             return
         
-        data = {}
-        for key, var in self.entry_vars.items():
-            value = var.get()
-            try:
-                data[key] = float(value) if value else 0.0
-            except ValueError:
-                data[key] = value
+        data = {key: _to_float(entry.get()) for key, entry in self._entry_items}
         
         # Usar el tipo de producto definido en la inicialización de la clase
-        if self.model.save_decisions(self.company_id, int(self.period_var.get()), data, self.product_type):
-            if self.model.increment_period(self.company_id):
-                self.period = int(self.period_var.get()) + 1
-                self.period_var.set(str(self.period))
-                self.display_period_var.set(f"PERIODO ACTUAL: {self.period}")
-                messagebox.showinfo("Éxito", "Decisiones guardadas y período actualizado")
-            else:
-                messagebox.showerror("Error", "Decisiones guardadas pero no se pudo actualizar el período")
+        new_period = self.model.save_and_advance(self.company_id, int(self.period_var.get()), data, self.product_type)
+        if new_period is not None:
+            self.period = new_period
+            if self.company_id in self._company_ids:
+                self._company_periods[self._company_ids.index(self.company_id)] = new_period
+            self.period_var.set(str(self.period))
+            self.display_period_var.set(f"PERIODO ACTUAL: {self.period}")
+            messagebox.showinfo("Éxito", "Decisiones guardadas y período actualizado")
         else:
             messagebox.showerror("Error", "Error al guardar decisiones")
     
     def _load_data(self):
         decisions = self.model.load_decisions(self.company_id, int(self.period_var.get()), self.product_type)
-        if decisions:
-            for key, value in decisions.items():
-                if key in self.entry_vars:
-                    self.entry_vars[key].set(str(value))
+        if not decisions:
+            return
+
+        entries = self.entries
+        for key, value in decisions.items():
+            entry = entries.get(key)
+            if entry is not None:
+                entry.delete(0, 'end')
+                entry.insert(0, value)
+        # Un solo repintado al terminar, no uno por celda
+        self.update_idletasks()
     
     def _on_closing(self):
         self.destroy()
         self.parent_app.show_main_menu()
 
-    def create_price_credit_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="PRECIOS Y CONDICIÓN DE CRÉDITO", padding=(10, 5))
+    def _build_grid_section(self, title: str, rows, key_fmt: str, sub_headers=(),
+                            boxed_header: bool = False, wrap_labels: bool = False):
+        """Construye una sección de filas x países (x sub-columnas) de Entries."""
+        frame = ttk.LabelFrame(self.sections_frame, text=title, padding=(10, 5))
         frame.pack(fill="x", padx=10, pady=10)
 
         countries = self.countries
-        sub_headers = ["TD", "ES"]
-        conditions = ["Condición Crédito 1", "Condición Crédito 2", "Condición Crédito 3"]
+        span = len(sub_headers) or 1
+        subs = sub_headers or (None,)
 
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) * len(sub_headers) + 1):
-            frame.grid_columnconfigure(i, weight=1)
+        configure_columns(frame, range(len(countries) * span + 1))
 
         ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
         for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i * 2, columnspan=2, padx=5, pady=2)
-
-        ttk.Label(frame, text="").grid(row=1, column=0, padx=5, pady=2)
-        for i in range(len(countries)):
-            for j, sub_header in enumerate(sub_headers):
-                ttk.Label(frame, text=sub_header, font=('Inter', 9)).grid(row=1, column=1 + i * 2 + j, padx=5, pady=2)
-
-        for r, condition in enumerate(conditions):
-            ttk.Label(frame, text=condition, anchor='w').grid(row=2 + r, column=0, padx=5, pady=2, sticky='w')
-            for c_idx, country in enumerate(countries):
-                for s_idx, sub_h in enumerate(sub_headers):
-                    key = f"price_credit_cond{r+1}_{country}_{sub_h}"
-                    var = tk.StringVar()
-                    entry = ttk.Entry(frame, width=12, textvariable=var)
-                    entry.grid(row=2 + r, column=1 + c_idx * 2 + s_idx, padx=2, pady=2, sticky='ew')
-                    self.entry_vars[key] = var
-
-    def create_production_transport_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="PRODUCCIÓN - TRANSPORTE", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        rows = ["Produc. Ordenada en el per", "Compras/vtas/castigos", "Stock Disponible para Venta", 
-                "Despacho Aéreo: Origen", "Despacho Aéreo: Destino"]
-
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i, padx=5, pady=2)
-
-        for r, row_label in enumerate(rows):
-            ttk.Label(frame, text=row_label, anchor='w').grid(row=1 + r, column=0, padx=5, pady=2, sticky='w')
-            for c_idx, country in enumerate(countries):
-                key = f"prod_trans_{row_label.replace(' ', '_').replace('/', '_').replace('.', '')}_{country}"
-                var = tk.StringVar()
-                entry = ttk.Entry(frame, width=12, textvariable=var)
-                entry.grid(row=1 + r, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-                self.entry_vars[key] = var
-
-    def create_plant_purchase_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="COMPRA DE PLANTAS DEL PERÍODO", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            header_cell = ttk.Frame(frame, relief='solid', borderwidth=1)
-            header_cell.grid(row=0, column=1 + i, padx=2, pady=2, sticky='nsew')
-            ttk.Label(header_cell, text=country, font=('Inter', 10, 'bold')).pack(fill='both', expand=True)
-
-        ttk.Label(frame, text="Condicion de Compra", anchor='w').grid(row=1, column=0, padx=5, pady=2, sticky='w')
-        for c_idx, country in enumerate(countries):
-            key = f"plant_purchase_condition_{country}"
-            var = tk.StringVar()
-            entry = ttk.Entry(frame, width=12, textvariable=var)
-            entry.grid(row=1, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-            self.entry_vars[key] = var
-
-    def create_raw_materials_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="Control de Materias Primas", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        rows = ["KITS - Consumo en Unidades", "Compra en Unidades", "PPA - Consumo en Unidades", 
-                "Compra en Unidades", "Condicion de compra"]
-        
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i, padx=5, pady=2)
-
-        for r, row_label in enumerate(rows):
-            ttk.Label(frame, text=row_label, anchor='w').grid(row=1 + r, column=0, padx=5, pady=2, sticky='w')
-            for c_idx, country in enumerate(countries):
-                key = f"raw_materials_{row_label.replace(' ', '_').replace('/', '_').replace('.', '').replace(':', '')}_{country}"
-                var = tk.StringVar()
-                entry = ttk.Entry(frame, width=12, textvariable=var)
-                entry.grid(row=1 + r, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-                self.entry_vars[key] = var
-
-    def create_sales_points_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="PUNTOS DE VENTAS", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        rows = ["N° Puntos Venta a Atender TD", "N° Puntos Venta a Atender ES", 
-                "N° Vendedores Contratados", "N° Vendedores en Funciones"]
-
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i, padx=5, pady=2)
-
-        for r, row_label in enumerate(rows):
-            ttk.Label(frame, text=row_label, anchor='w').grid(row=1 + r, column=0, padx=5, pady=2, sticky='w')
-            for c_idx, country in enumerate(countries):
-                key = f"sales_points_{row_label.replace(' ', '_').replace('°', 'N').replace('.', '')}_{country}"
-                var = tk.StringVar()
-                entry = ttk.Entry(frame, width=12, textvariable=var)
-                entry.grid(row=1 + r, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-                self.entry_vars[key] = var
-
-    def create_seller_compensation_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="Remuneración Variable Vendedores", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        rows = ["Remuneración variable vendedores (%)"]
-        
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i, padx=5, pady=2)
-
-        for r, row_label in enumerate(rows):
-            ttk.Label(frame, text=row_label, anchor='w').grid(row=1 + r, column=0, padx=5, pady=2, sticky='w')
-            for c_idx, country in enumerate(countries):
-                key = f"variable_comp_{row_label.replace(' ', '_').replace('%', 'perc')}_{country}"
-                var = tk.StringVar()
-                entry = ttk.Entry(frame, width=12, textvariable=var)
-                entry.grid(row=1 + r, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-                self.entry_vars[key] = var
-
-    def create_advertising_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="PUBLICIDAD (Frecuencia)", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        media_types = [
-            "Revista PC Actualidad", "Diario Negocios y Economía", "Diario Sensacionalista",
-            "Televisión Abierta", "Televisión Cable", "Circuito ABC1", "Circuito C2C3",
-            "Radio Adulto Joven", "Radio Noticias", "Radio La TIERRA", "Portal Diario Electrónico"
-        ]
-        
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i, padx=5, pady=2)
-
-        for r_idx, media in enumerate(media_types):
-            ttk.Label(frame, text=media, anchor='w', wraplength=100, justify='left').grid(row=1 + r_idx, column=0, padx=5, pady=2, sticky='w')
+            if boxed_header:
+                header_cell = ttk.Frame(frame, relief='solid', borderwidth=1)
+                header_cell.grid(row=0, column=1 + i, padx=2, pady=2, sticky='nsew')
+                ttk.Label(header_cell, text=country, font=('Inter', 10, 'bold')).pack(fill='both', expand=True)
+            else:
+                ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(row=0, column=1 + i * span, columnspan=span, padx=5, pady=2)
+
+        first_row = 1
+        if sub_headers:
+            ttk.Label(frame, text="").grid(row=1, column=0, padx=5, pady=2)
+            for i in range(len(countries)):
+                for j, sub_header in enumerate(sub_headers):
+                    ttk.Label(frame, text=sub_header, font=('Inter', 9)).grid(row=1, column=1 + i * span + j, padx=5, pady=2)
+            first_row = 2
+
+        label_opts = {'wraplength': 100, 'justify': 'left'} if wrap_labels else {}
+        for r, (row_label, row_token) in enumerate(rows):
+            ttk.Label(frame, text=row_label, anchor='w', **label_opts).grid(row=first_row + r, column=0, padx=5, pady=2, sticky='w')
             for c_idx, country in enumerate(countries):
-                key = f"advertising_freq_{media.replace(' ', '_').replace('.', '')}_{country}"
-                var = tk.StringVar()
-                entry = ttk.Entry(frame, width=12, textvariable=var)
-                entry.grid(row=1 + r_idx, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-                self.entry_vars[key] = var
-
-    def create_investments_section(self):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="INVERSIONES - PROMOCIONES SIN PUBLICIDAD", padding=(10, 5))
-        frame.pack(fill="x", padx=10, pady=10)
-
-        countries = self.countries
-        
-        frame.grid_columnconfigure(0, weight=1)
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
-
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            header_cell = ttk.Frame(frame, relief='solid', borderwidth=1)
-            header_cell.grid(row=0, column=1 + i, padx=2, pady=2, sticky='nsew')
-            ttk.Label(header_cell, text=country, font=('Inter', 10, 'bold')).pack(fill='both', expand=True)
-
-        ttk.Label(frame, text="Condicion de Compra", anchor='w').grid(row=1, column=0, padx=5, pady=2, sticky='w')
-        for c_idx, country in enumerate(countries):
-            key = f"investment_condition_{country}"
-            var = tk.StringVar()
-            entry = ttk.Entry(frame, width=12, textvariable=var)
-            entry.grid(row=1, column=1 + c_idx, padx=2, pady=2, sticky='ew')
-            self.entry_vars[key] = var
+                for s_idx, sub_h in enumerate(subs):
+                    key = key_fmt.format(r=r + 1, row=row_token, country=country, sub=sub_h)
+                    entry = ttk.Entry(frame, width=12)
+                    entry.grid(row=first_row + r, column=1 + c_idx * span + s_idx, padx=2, pady=2, sticky='ew')
+                    self.entries[key] = entry
 
 class ProductsSelectionUI(tk.Toplevel):
     """Interfaz para seleccionar entre productos HOME y PROFESSIONAL."""
@@ -1,11 +1,12 @@
 # informacionadicionalbalance.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterable, Tuple
+from Interfaces.db import DB_FILE, connect, dumps, loads
+from Interfaces.widgets import ScrollableFrame
 
 # ------------------------- Configuración Inicial -------------------------
 logger = logging.getLogger(__name__)
@@ -14,48 +15,142 @@ logger = logging.getLogger(__name__)
 class AdditionalBalanceInfoModel:
     """Modelo para manejar la información adicional del balance."""
     
+    # Datos ya decodificados por (company_id, period). Es de clase porque cada
+    # ventana crea su propio modelo y así se reutiliza al reabrir; solo este
+    # módulo escribe ADDITIONAL_BALANCE_INFO, y save_additional_info invalida.
+    # También guarda None para los pares sin fila, así un formulario vacío
+    # no vuelve a consultar la base al reabrirse.
+    _cache: Dict[Tuple[int, int], Optional[Dict[str, Any]]] = {}
+    
     def __init__(self, db_file: Path):
         self.db_file = db_file
+        # Una sola conexión durante la vida del modelo; las lecturas van por
+        # posición, así que bastan tuplas sin row_factory
+        self._conn = connect(self.db_file, check_same_thread=False)
+        self._cursor = self._conn.cursor()
         
     def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self._conn
+    
+    def close(self):
+        """Cierra la conexión del modelo."""
+        self._conn.close()
             
-    def save_additional_info(self, company_id: int, period: int, data: Dict[str, Any]) -> bool:
-        """Guarda los datos de información adicional en la base de datos."""
+    def save_additional_info(self, rows: Iterable[Tuple[int, int, str, Any]]) -> bool:
+        """Guarda los datos de información adicional en la base de datos.
+
+        rows son tuplas (company_id, period, field_key, value); todo se escribe
+        en una sola transacción.
+        """
+        rows = list(rows)
+        conn = self.get_connection()
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "REPLACE INTO financial_statement (company_id, period, type, data) VALUES (?, ?, ?, ?)",
-                    (company_id, period, "ADDITIONAL_BALANCE_INFO", json.dumps(data))
-                )
-                conn.commit()
-                return True
+            # Un blob JSON por (company_id, period) en financial_statement
+            blobs: Dict[Tuple[int, int], Dict[str, Any]] = {}
+            for company_id, period, key, value in rows:
+                blobs.setdefault((company_id, period), {})[key] = value
+            self._cursor.executemany(
+                "REPLACE INTO financial_statement (company_id, period, type, data) VALUES (?, ?, ?, ?)",
+                [(company_id, period, "ADDITIONAL_BALANCE_INFO", dumps(data))
+                 for (company_id, period), data in blobs.items()]
+            )
+            conn.commit()
+            for company_id, period, *_ in rows:
+                self._cache.pop((company_id, period), None)
+            return True
         except Exception as e:
+            conn.rollback()
             logger.error(f"Error saving additional balance info: {str(e)}")
             return False
             
     def load_additional_info(self, company_id: int, period: int) -> Optional[Dict[str, Any]]:
         """Carga los datos de información adicional desde la base de datos."""
+        cache_key = (company_id, period)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?",
-                    (company_id, period, "ADDITIONAL_BALANCE_INFO")
-                )
-                row = cursor.fetchone()
-                return json.loads(row["data"]) if row else None
+            data = self._fetch_additional_info(company_id, period)
         except Exception as e:
             logger.error(f"Error loading additional balance info: {str(e)}")
             return None
+        self._cache[cache_key] = data
+        return data
+    
+    def _fetch_additional_info(self, company_id: int, period: int) -> Optional[Dict[str, Any]]:
+        """Lee y decodifica los datos de la base de datos, sin pasar por la caché."""
+        cursor = self._cursor
+        # La PRIMARY KEY (company_id, period, type) ya es el índice único de
+        # esta búsqueda y del REPLACE; un índice adicional solo duplicaría escrituras
+        cursor.execute(
+            "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?",
+            (company_id, period, "ADDITIONAL_BALANCE_INFO")
+        )
+        row = cursor.fetchone()
+        return loads(row[0]) if row else None
 
 # ------------------------- Vista -------------------------
 class AdditionalBalanceInfoUI(tk.Toplevel):
     """Interfaz gráfica para la Información Adicional del Balance."""
     
+    # Los estilos ttk son globales a la raíz Tk: basta configurarlos una vez
+    _STYLES_DONE = False
+    
+    # Campos de cada sección: (clave, etiqueta, unidad)
+    _INFO_FIELDS = (
+        ("reclamos_notas_credito", "Reclamos de Notas de Crédito del Período", ""),
+        ("linea_sobregiro", "Línea de Sobregiro Autorizada por el Banco", ""),
+        ("traspaso_corto_plazo", "Traspaso a Corto Plazo de la Deuda Largo Plazo", ""),
+        ("plantas_vida_util", "Plantas que Terminan Su Vida Util en el Período (Valor)", ""),
+        ("muebles_vida_util", "Muebles que Terminan Su Vida Util en el Período (Valor)", ""),
+        ("traspaso_activo_intangible", "Traspaso a Activo Fijo como Intangible", ""),
+        ("amortizaciones_intangible", "Amortizaciones Intangible", ""),
+        ("reclamo_seguro_mercaderias", "Reclamo Seguro Mercaderías", ""),
+        ("reclamo_seguro_edificios", "Reclamo Seguro Edificios", ""),
+        ("reclamo_seguro_plantas", "Reclamo Seguro Plantas", ""),
+        ("intereses_ganados", "Intereses Ganados Devengados en el período", ""),
+        ("dividendos_declarados", "Dividendos Declarados del período", ""),
+        ("provisiones_adicionales", "Provisiones adicionales período [pasivo/pérdida]", ""),
+        ("venta_bruta_credito_empresas", "Venta Bruta al crédito entre empresas competidoras", ""),
+        ("impuesto_ventas_empresas", "Impuesto por ventas e empresas competidoras", ""),
+        ("ajuste_impuesto_plena", "Ajuste Impuesto a la Plena períodos anteriores (+/-)", ""),
+        ("compra_bruta_home_credito", "Compra Bruta 'HOME' al Crédito Empresas Competidoras", ""),
+        ("compra_bruta_pro_credito", "Compra Bruta 'PROFESSIONAL' al Crédito Empresas Competidoras", ""),
+        ("perdidas_tributarias", "Pérdidas Tributarias acumuladas", ""),
+        ("remuneracion_variable", "Remuneraciones variable promedio unitario Producción", "US$"),
+        ("costo_variable_home", "Costo Variable unitario Producción del Período HOME", "US$"),
+        ("costo_variable_pro", "Costo Variable unitario Producción del Período PROFESSIONAL", "US$"),
+        ("costo_variable_terminado_home", "Costo Variable unitario Productos Terminados HOME", "US$"),
+        ("costo_variable_terminado_pro", "Costo Variable unitario Productos Terminados PROFESSIONAL", "US$"),
+        ("tasa_impuesto_renta", "Tasa Impuesto a la Renta", "%"),
+        ("tasa_dividendos", "Tasa distribución de Dividendos", "%"),
+    )
+    
+    _MARKET_FIELDS = (
+        ("participacion_mercado_usd_home", "Participación de Mercado en US$ + HOME", ""),
+        ("participacion_mercado_usd_pro", "Participación de Mercado en US$ - PROFESSIONAL", ""),
+        ("participacion_mercado_ud_home", "Participación de Mercado en Unidades + HOME", ""),
+        ("participacion_mercado_ud_pro", "Participación de Mercado en Unidades - PROFESSIONAL", ""),
+        ("rendimiento", "Rendimiento", "%"),
+    )
+    
+    _FINANCIAL_FIELDS = (
+        ("ventas_totales", "Ventas Totales del período", ""),
+        ("resultado_periodo", "Resultado del período", ""),
+        ("situacion_tesoreria", "Situación de Tesorería", ""),
+        ("disponible", "Disponible", ""),
+    )
+    
+    _SPECIAL_FIELDS = (
+        ("sobregiro_estimado", "Sobregiro Estimado", ""),
+        ("prestamos_estimados", "Préstamos Estimados", ""),
+    )
+    
+    _ALL_FIELDS = _INFO_FIELDS + _MARKET_FIELDS + _FINANCIAL_FIELDS + _SPECIAL_FIELDS
+    
+    # Alto aproximado de las secciones que se construyen al hacerse visibles
+    _MARKET_HEIGHT = 200
+    _FINANCIAL_HEIGHT = 230
+    
     def __init__(self, parent_app, company_id: int, company_name: str, period: int):
         super().__init__(parent_app)
         self.parent_app = parent_app
@@ -64,14 +159,20 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = AdditionalBalanceInfoModel(db_file)
+        self.model = AdditionalBalanceInfoModel(DB_FILE)
+        # Los guardados corren en un único hilo para no bloquear la interfaz
+        self._io_executor = ThreadPoolExecutor(max_workers=1)
+        self._save_poll_id = None
         
         # Inicializar variables
-        self.entry_vars = {}
+        self.entries: Dict[str, tk.Entry] = {}
+        self._initial_data = {}
+        # (marcador, constructor) de las secciones aún no construidas, en orden
+        self._lazy_sections = []
         
         self._setup_ui()
         self._load_initial_data()
+        self.protocol("WM_DELETE_WINDOW", self._on_closing)
         
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -83,12 +184,14 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
         self._create_scrollable_frame()
         self._create_header()
         self._create_info_section()
-        self._create_market_section()
-        self._create_financial_section()
+        self._add_lazy_section(self._create_market_section, self._MARKET_HEIGHT)
+        self._add_lazy_section(self._create_financial_section, self._FINANCIAL_HEIGHT)
         self._create_buttons()
         
     def _configure_styles(self):
         """Configura los estilos de la interfaz."""
+        if AdditionalBalanceInfoUI._STYLES_DONE:
+            return
         style = ttk.Style()
         style.theme_use('clam')
         style.configure('TFrame', background='#DCDAD5')
@@ -104,21 +207,40 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
         style.configure('Section.TLabel', font=('Inter', 11, 'bold'), background='#DCDAD5')
         style.configure('Bold.TLabel', font=('Inter', 9, 'bold'))
         style.configure('Right.TLabel', anchor='e')
+        AdditionalBalanceInfoUI._STYLES_DONE = True
         
     def _create_scrollable_frame(self):
         """Crea el área desplazable principal."""
-        self.main_canvas = tk.Canvas(self, bg='#DCDAD5')
-        self.main_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.main_canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.main_canvas)
+        scroll = ScrollableFrame(self)
+        self.main_canvas = scroll.canvas
+        self.main_scrollbar = scroll.scrollbar
+        self.scrollable_frame = scroll.frame
+        # La barra se actualiza desde _on_yview_change, que además construye
+        # las secciones pendientes
+        self.main_canvas.configure(yscrollcommand=self._on_yview_change)
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.main_canvas.configure(scrollregion=self.main_canvas.bbox("all")))
-        
-        self.main_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.main_canvas.configure(yscrollcommand=self.main_scrollbar.set)
-        self.main_canvas.pack(side="left", fill="both", expand=True)
-        self.main_scrollbar.pack(side="right", fill="y")
+    def _on_yview_change(self, first, last):
+        """Actualiza la barra y construye las secciones que entraron en la vista."""
+        self.main_scrollbar.set(first, last)
+        if self._lazy_sections:
+            self._build_visible_sections()
+    
+    def _add_lazy_section(self, builder, height: int):
+        """Reserva el lugar de una sección que se construye al hacerse visible."""
+        placeholder = ttk.Frame(self.scrollable_frame, height=height)
+        placeholder.pack(fill="x")
+        self._lazy_sections.append((placeholder, builder))
+    
+    def _build_visible_sections(self):
+        bottom = self.main_canvas.canvasy(self.main_canvas.winfo_height())
+        while self._lazy_sections:
+            placeholder, builder = self._lazy_sections[0]
+            if placeholder.winfo_y() > bottom:
+                break
+            self._lazy_sections.pop(0)
+            new_keys = set(self.entries)
+            builder(placeholder)
+            self._apply_initial_data(set(self.entries) - new_keys)
         
     def _create_header(self):
         """Crea el encabezado con información de empresa y período."""
@@ -145,137 +267,52 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
         info_frame.grid_columnconfigure(1, weight=1)
         info_frame.grid_columnconfigure(3, weight=1)
         
+    def _build_section(self, container, fields, label_width: int, first_row: int = 0, pady: int = 2, **label_opts):
+        """Agrega una fila (etiqueta, entrada, unidad) al grid de container por cada campo."""
+        for i, (key, label, unit) in enumerate(fields, start=first_row):
+            self._add_row(container, i, key, label, unit, label_width, pady, **label_opts)
+        
+        container.columnconfigure(0, weight=1)
+    
+    def _add_row(self, container, row: int, key: str, label: str, unit: str, label_width: int, pady: int = 2, **label_opts):
+        """Crea la fila de un campo en la fila row del grid de container."""
+        # Etiqueta
+        ttk.Label(container, text=label, width=label_width, anchor='w', **label_opts).grid(row=row, column=0, padx=(5, 0), pady=pady, sticky='w')
+        
+        # Entrada
+        entry = tk.Entry(container, width=15, bg='white', relief='solid', bd=1, font=('Inter', 9))
+        entry.grid(row=row, column=1, padx=(10, 5), pady=pady)
+        self.entries[key] = entry
+        
+        # Unidad
+        if unit:
+            ttk.Label(container, text=unit).grid(row=row, column=2, pady=pady, sticky='w')
+    
     def _create_info_section(self):
         """Crea la sección principal de información adicional."""
         section_frame = ttk.Frame(self.scrollable_frame, padding=(10, 10))
         section_frame.pack(fill="x", padx=10, pady=10)
         
-        # Lista de campos con sus etiquetas y unidades
-        fields = [
-            ("reclamos_notas_credito", "Reclamos de Notas de Crédito del Período", ""),
-            ("linea_sobregiro", "Línea de Sobregiro Autorizada por el Banco", ""),
-            ("traspaso_corto_plazo", "Traspaso a Corto Plazo de la Deuda Largo Plazo", ""),
-            ("plantas_vida_util", "Plantas que Terminan Su Vida Util en el Período (Valor)", ""),
-            ("muebles_vida_util", "Muebles que Terminan Su Vida Util en el Período (Valor)", ""),
-            ("traspaso_activo_intangible", "Traspaso a Activo Fijo como Intangible", ""),
-            ("amortizaciones_intangible", "Amortizaciones Intangible", ""),
-            ("reclamo_seguro_mercaderias", "Reclamo Seguro Mercaderías", ""),
-            ("reclamo_seguro_edificios", "Reclamo Seguro Edificios", ""),
-            ("reclamo_seguro_plantas", "Reclamo Seguro Plantas", ""),
-            ("intereses_ganados", "Intereses Ganados Devengados en el período", ""),
-            ("dividendos_declarados", "Dividendos Declarados del período", ""),
-            ("provisiones_adicionales", "Provisiones adicionales período [pasivo/pérdida]", ""),
-            ("venta_bruta_credito_empresas", "Venta Bruta al crédito entre empresas competidoras", ""),
-            ("impuesto_ventas_empresas", "Impuesto por ventas e empresas competidoras", ""),
-            ("ajuste_impuesto_plena", "Ajuste Impuesto a la Plena períodos anteriores (+/-)", ""),
-            ("compra_bruta_home_credito", "Compra Bruta 'HOME' al Crédito Empresas Competidoras", ""),
-            ("compra_bruta_pro_credito", "Compra Bruta 'PROFESSIONAL' al Crédito Empresas Competidoras", ""),
-            ("perdidas_tributarias", "Pérdidas Tributarias acumuladas", ""),
-            ("remuneracion_variable", "Remuneraciones variable promedio unitario Producción", "US$"),
-            ("costo_variable_home", "Costo Variable unitario Producción del Período HOME", "US$"),
-            ("costo_variable_pro", "Costo Variable unitario Producción del Período PROFESSIONAL", "US$"),
-            ("costo_variable_terminado_home", "Costo Variable unitario Productos Terminados HOME", "US$"),
-            ("costo_variable_terminado_pro", "Costo Variable unitario Productos Terminados PROFESSIONAL", "US$"),
-            ("tasa_impuesto_renta", "Tasa Impuesto a la Renta", "%"),
-            ("tasa_dividendos", "Tasa distribución de Dividendos", "%"),
-        ]
+        self._build_section(section_frame, self._INFO_FIELDS, label_width=60)
         
-        for i, (key, label, unit) in enumerate(fields):
-            row_frame = ttk.Frame(section_frame)
-            row_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Etiqueta
-            ttk.Label(row_frame, text=label, width=60, anchor='w').grid(row=0, column=0, sticky='w')
-            
-            # Entrada
-            var = tk.StringVar(value="")
-            entry = ttk.Entry(row_frame, textvariable=var, width=15)
-            entry.grid(row=0, column=1, padx=(10, 5))
-            self.entry_vars[key] = var
-            
-            # Unidad
-            if unit:
-                ttk.Label(row_frame, text=unit).grid(row=0, column=2, sticky='w')
-            
-            row_frame.columnconfigure(0, weight=1)
-        
-    def _create_market_section(self):
+    def _create_market_section(self, parent):
         """Crea la sección de participación de mercado."""
-        section_frame = ttk.LabelFrame(self.scrollable_frame, text="PARTICIPACIÓN DE MERCADO", 
+        section_frame = ttk.LabelFrame(parent, text="PARTICIPACIÓN DE MERCADO", 
                                       padding=(10, 10))
         section_frame.pack(fill="x", padx=10, pady=10)
         
-        fields = [
-            ("participacion_mercado_usd_home", "Participación de Mercado en US$ + HOME", ""),
-            ("participacion_mercado_usd_pro", "Participación de Mercado en US$ - PROFESSIONAL", ""),
-            ("participacion_mercado_ud_home", "Participación de Mercado en Unidades + HOME", ""),
-            ("participacion_mercado_ud_pro", "Participación de Mercado en Unidades - PROFESSIONAL", ""),
-            ("rendimiento", "Rendimiento", "%"),
-        ]
-        
-        for i, (key, label, unit) in enumerate(fields):
-            row_frame = ttk.Frame(section_frame)
-            row_frame.pack(fill="x", padx=5, pady=2)
-            
-            ttk.Label(row_frame, text=label, width=50, anchor='w').grid(row=0, column=0, sticky='w')
-            
-            var = tk.StringVar(value="")
-            entry = ttk.Entry(row_frame, textvariable=var, width=15)
-            entry.grid(row=0, column=1, padx=(10, 5))
-            self.entry_vars[key] = var
-            
-            if unit:
-                ttk.Label(row_frame, text=unit).grid(row=0, column=2, sticky='w')
-            
-            row_frame.columnconfigure(0, weight=1)
+        self._build_section(section_frame, self._MARKET_FIELDS, label_width=50)
         
-    def _create_financial_section(self):
+    def _create_financial_section(self, parent):
         """Crea la sección de información financiera final."""
-        section_frame = ttk.Frame(self.scrollable_frame, padding=(10, 10))
+        section_frame = ttk.Frame(parent, padding=(10, 10))
         section_frame.pack(fill="x", padx=10, pady=10)
         
-        fields = [
-            ("ventas_totales", "Ventas Totales del período", ""),
-            ("resultado_periodo", "Resultado del período", ""),
-            ("situacion_tesoreria", "Situación de Tesorería", ""),
-            ("disponible", "Disponible", ""),
-        ]
-        
-        for i, (key, label, unit) in enumerate(fields):
-            row_frame = ttk.Frame(section_frame)
-            row_frame.pack(fill="x", padx=5, pady=2)
-            
-            ttk.Label(row_frame, text=label, width=40, anchor='w', style='Bold.TLabel').grid(row=0, column=0, sticky='w')
-            
-            var = tk.StringVar(value="")
-            entry = ttk.Entry(row_frame, textvariable=var, width=15)
-            entry.grid(row=0, column=1, padx=(10, 5))
-            self.entry_vars[key] = var
-            
-            if unit:
-                ttk.Label(row_frame, text=unit).grid(row=0, column=2, sticky='w')
-            
-            row_frame.columnconfigure(0, weight=1)
+        self._build_section(section_frame, self._FINANCIAL_FIELDS, label_width=40, style='Bold.TLabel')
         
         # Campos finales especiales
-        special_fields = [
-            ("sobregiro_estimado", "Sobregiro Estimado", ""),
-            ("prestamos_estimados", "Préstamos Estimados", ""),
-        ]
-        
-        for key, label, unit in special_fields:
-            row_frame = ttk.Frame(section_frame)
-            row_frame.pack(fill="x", padx=5, pady=5)
-            
-            ttk.Label(row_frame, text=label, font=('Inter', 10, 'bold'), width=30, anchor='w').grid(row=0, column=0, sticky='w')
-            
-            var = tk.StringVar(value="")
-            entry = ttk.Entry(row_frame, textvariable=var, width=15)
-            entry.grid(row=0, column=1, padx=(10, 5))
-            self.entry_vars[key] = var
-            
-            if unit:
-                ttk.Label(row_frame, text=unit).grid(row=0, column=2, sticky='w')
+        self._build_section(section_frame, self._SPECIAL_FIELDS, label_width=30,
+                            first_row=len(self._FINANCIAL_FIELDS), pady=5, font=('Inter', 10, 'bold'))
         
     def _create_buttons(self):
         """Crea los botones de acción."""
@@ -284,19 +321,23 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
         
         ttk.Button(button_frame, text="Calcular", 
                   command=self.calculate_values).pack(side="left", padx=5, pady=5)
-        ttk.Button(button_frame, text="Guardar", 
-                  command=self.save_data).pack(side="left", padx=5, pady=5)
+        self.save_button = ttk.Button(button_frame, text="Guardar", command=self.save_data)
+        self.save_button.pack(side="left", padx=5, pady=5)
         ttk.Button(button_frame, text="Volver al Menú Principal", 
                   command=self._on_closing).pack(side="right", padx=5, pady=5)
         
     def _load_initial_data(self):
         """Carga los datos iniciales desde la base de datos."""
-        additional_info = self.model.load_additional_info(self.company_id, self.period_int)
-        
-        if additional_info:
-            for key, var in self.entry_vars.items():
-                if key in additional_info:
-                    var.set(str(additional_info[key]))
+        self._initial_data = self.model.load_additional_info(self.company_id, self.period_int) or {}
+        self._apply_initial_data(self.entries)
+    
+    def _apply_initial_data(self, keys):
+        """Carga en las entradas indicadas los valores leídos de la base de datos."""
+        for key in keys:
+            if key in self._initial_data:
+                entry = self.entries[key]
+                entry.delete(0, 'end')
+                entry.insert(0, str(self._initial_data[key]))
     
     def calculate_values(self):
         """Calcula los valores (placeholder)."""
@@ -306,26 +347,56 @@ class AdditionalBalanceInfoUI(tk.Toplevel):
     def save_data(self):
         """Guarda los datos en la base de datos."""
         try:
-            data = {}
-            for key, var in self.entry_vars.items():
-                value = var.get()
+            rows = []
+            for key, _, _ in self._ALL_FIELDS:
+                # Las secciones no construidas conservan el valor cargado
+                entry = self.entries.get(key)
+                value = entry.get() if entry is not None else str(self._initial_data.get(key, ""))
                 # Intentar convertir a número si es posible
-                try:
-                    data[key] = float(value) if value else 0.0
-                except ValueError:
-                    data[key] = value  # Guardar como cadena si no es convertible
+                if not value:
+                    value = 0.0
+                else:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        pass  # Guardar como cadena si no es convertible
+                rows.append((self.company_id, self.period_int, key, value))
 
-            if self.model.save_additional_info(self.company_id, self.period_int, data):
-                messagebox.showinfo("Éxito", 
-                                  f"Datos guardados para el período {self.period_int} de {self.company_name_str}")
-            else:
-                messagebox.showerror("Error", "Error al guardar los datos en la base de datos")
+            future = self._io_executor.submit(self.model.save_additional_info, rows)
+            # Un solo guardado a la vez: así _save_poll_id es la única espera
+            # pendiente y _on_closing puede cancelarla
+            self.save_button.state(["disabled"])
+            self._save_poll_id = self.after(50, self._poll_save_future, future)
+        except Exception as e:
+            logger.error(f"Error inesperado al guardar: {str(e)}")
+            messagebox.showerror("Error", f"Error al guardar: {str(e)}")
+    
+    def _poll_save_future(self, future):
+        """Espera en el hilo de Tk a que termine el guardado y muestra el resultado."""
+        if not future.done():
+            self._save_poll_id = self.after(50, self._poll_save_future, future)
+            return
+        self._save_poll_id = None
+        self.save_button.state(["!disabled"])
+        try:
+            saved = future.result()
         except Exception as e:
             logger.error(f"Error inesperado al guardar: {str(e)}")
             messagebox.showerror("Error", f"Error al guardar: {str(e)}")
+            return
+        if saved:
+            messagebox.showinfo("Éxito", 
+                              f"Datos guardados para el período {self.period_int} de {self.company_name_str}")
+        else:
+            messagebox.showerror("Error", "Error al guardar los datos en la base de datos")
     
     def _on_closing(self):
         """Maneja el cierre de la ventana para volver al menú principal."""
+        if self._save_poll_id is not None:
+            self.after_cancel(self._save_poll_id)
+        # Terminar un guardado en curso antes de cerrar la conexión
+        self._io_executor.shutdown(wait=True)
+        self.model.close()
         self.destroy()
         self.parent_app.show_main_menu()
 
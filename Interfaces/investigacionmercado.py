@@ -1,15 +1,47 @@
 import tkinter as tk
+from functools import lru_cache
 from tkinter import ttk, messagebox
-import json
-import sqlite3
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Any, List
+from Interfaces.db import get_shared
+from Interfaces.widgets import TreeCellEditor, configure_columns
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Configuración y Constantes
 # ────────────────────────────────────────────────────────────────────────────────
 
-DB_FILE = Path(__file__).parent.parent / "captop.db"
+# Limpieza del nombre de un ítem para formar su clave
+_KEY_TABLE = str.maketrans({' ': '_', '.': None, '-': '_'})
+
+
+@lru_cache(maxsize=256)
+def _field_key(item: str, field: str) -> str:
+    """Genera una clave única para cada campo."""
+    return f"mr_{item.translate(_KEY_TABLE)}_{field}"
+
+# Textos ya convertidos por _to_float; se repiten en cada recálculo
+_float_cache: Dict[str, float] = {}
+_FLOAT_CACHE_MAX = 1024
+
+
+def _to_float(text: str) -> float:
+    """Convierte el texto de una entrada a float (0 si está vacío); ValueError si no es numérico."""
+    if not text:
+        return 0.0
+    value = _float_cache.get(text)
+    if value is None:
+        value = float(text)
+        if len(_float_cache) < _FLOAT_CACHE_MAX:
+            _float_cache[text] = value
+    return value
+
+
+def _cell_text(value) -> str:
+    """Texto de una celda para un valor leído de la base (3.0 se muestra como 3)."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return "" if value is None else str(value)
+
 
 # Textos para internacionalización
 TEXTS = {
@@ -28,46 +60,6 @@ TEXTS = {
     "headers": ["", "Home", "Professional", "Precio Unitario", "Costo"],
 }
 
-# ────────────────────────────────────────────────────────────────────────────────
-#  Modelo - Manejo de Base de Datos
-# ────────────────────────────────────────────────────────────────────────────────
-
-class DatabaseManager:
-    """Manejador de la base de datos encapsulando todas las operaciones SQL."""
-    
-    def __init__(self, db_file: Path):
-        self.db_file = db_file
-    
-    def get_connection(self):
-        """Devuelve una conexión SQLite con filas accesibles por nombre."""
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
-    
-    def save_decision(self, company_id: int, period: int, payload: Dict) -> bool:
-        """Guarda las decisiones de investigación de mercado."""
-        with self.get_connection() as conn:
-            try:
-                cur = conn.cursor()
-                cur.execute(
-                    "REPLACE INTO decision (company_id, period, payload) VALUES (?, ?, ?)",
-                    (company_id, period, json.dumps(payload))
-                )
-                conn.commit()
-                return True
-            except sqlite3.Error:
-                return False
-    
-    def load_decision(self, company_id: int, period: int) -> Optional[Dict]:
-        """Carga las decisiones de investigación de mercado."""
-        with self.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT payload FROM decision WHERE company_id = ? AND period = ?",
-                (company_id, period))
-            row = cur.fetchone()
-            return json.loads(row["payload"]) if row else None
-
 # ────────────────────────────────────────────────────────────────────────────────
 #  Vista - Interfaz de Usuario
 # ────────────────────────────────────────────────────────────────────────────────
@@ -75,13 +67,19 @@ class DatabaseManager:
 class MarketResearchUI(tk.Toplevel):
     """Interfaz gráfica para la sección de Investigación de Mercado."""
     
+    # Columnas de la tabla, en el orden de TEXTS["headers"]
+    _TREE_COLUMNS = ("item", "home", "pro", "unit", "cost")
+    
     def __init__(self, parent_app, company_id: int, company_name: str, period: int):
         super().__init__(parent_app)
         self.parent_app = parent_app
         self.company_id = company_id
         self.company_name = company_name
         self.period = period
-        self.db = DatabaseManager(DB_FILE)
+        self.db = get_shared()
+        # Las lecturas corren en un único hilo para no bloquear la interfaz
+        self._io = ThreadPoolExecutor(max_workers=1)
+        self._load_poll_id = None
         
         # Configuración inicial de la ventana
         self.title(TEXTS["window_title"])
@@ -93,8 +91,9 @@ class MarketResearchUI(tk.Toplevel):
         self._configure_styles()
         
         # Variables de control
-        self.entry_vars: Dict[str, tk.StringVar] = {}
         self.calculated_vars: Dict[str, tk.StringVar] = {}
+        # Recalculo pendiente (after id) mientras el usuario sigue escribiendo
+        self._calc_after_id = None
         
         # Crear widgets
         self._create_widgets()
@@ -112,6 +111,8 @@ class MarketResearchUI(tk.Toplevel):
         style.configure("TEntry", fieldbackground="white", relief="solid", padding=2)
         style.configure("TButton", font=("Inter", 10, "bold"))
         style.configure("Bold.TLabel", font=("Inter", 10, "bold"))
+        style.configure("Treeview", font=("Inter", 10), rowheight=24)
+        style.configure("Treeview.Heading", font=("Inter", 10, "bold"))
     
     def _create_widgets(self):
         """Crea todos los widgets de la interfaz."""
@@ -187,38 +188,60 @@ class MarketResearchUI(tk.Toplevel):
             padding=(10, 5)
         )
         frame.pack(fill="x", padx=10, pady=10)
+        frame.columnconfigure(0, weight=3)
+        configure_columns(frame, range(1, len(TEXTS["headers"])))
         
-        # Encabezados de la tabla
-        for col, header in enumerate(TEXTS["headers"]):
-            ttk.Label(frame, text=header, style="Bold.TLabel").grid(
-                row=0, column=col, padx=4, pady=2
-            )
-            frame.columnconfigure(col, weight=1 if col else 3)
+        # Claves (home, professional, precio unitario, costo) de cada ítem,
+        # calculadas una sola vez para _calculate_costs
+        self._item_keys = [
+            tuple(_field_key(item, field)
+                  for field in ("Home", "Professional", "Precio Unitario", "Costo"))
+            for item in self.research_items
+        ]
         
-        # Filas de la tabla
-        for row, item in enumerate(self.research_items, start=1):
-            # Nombre del ítem
-            ttk.Label(frame, text=item, anchor="w", wraplength=250).grid(
-                row=row, column=0, padx=4, pady=2, sticky="w"
-            )
-            
-            # Campos de entrada
-            for idx, col_name in enumerate(TEXTS["headers"][1:-1]):
-                key = self._generate_field_key(item, col_name)
-                entry = self._create_entry(frame, key)
-                entry.grid(row=row, column=idx+1, padx=2, pady=2, sticky="ew")
-            
-            # Campo de costo calculado
-            cost_key = self._generate_field_key(item, "Costo")
-            lbl = self._create_calculated_label(frame, cost_key)
-            lbl.grid(row=row, column=4, padx=2, pady=2, sticky="ew")
+        # Datos a guardar (solo lo ingresado; los costos se recalculan al cargar),
+        # con el mismo orden de claves que el formulario. Es también el valor
+        # mostrado en cada celda de la tabla.
+        self._values = {k: "" for keys in self._item_keys for k in keys[:-1]}
+        
+        # Tabla: un solo Treeview dibuja todas las filas; la fila i tiene iid str(i)
+        self.tree = ttk.Treeview(
+            frame,
+            columns=self._TREE_COLUMNS,
+            show="headings",
+            height=len(self.research_items),
+            selectmode="browse"
+        )
+        for column, header in zip(self._TREE_COLUMNS, TEXTS["headers"]):
+            self.tree.heading(column, text=header)
+            if column == "item":
+                self.tree.column(column, width=340, anchor="w", stretch=True)
+            else:
+                self.tree.column(column, width=120, anchor="e", stretch=True)
+        
+        # Celda (iid, columna) de cada clave editable
+        self._cell_of: Dict[str, tuple] = {}
+        for i, (item, keys) in enumerate(zip(self.research_items, self._item_keys)):
+            self.tree.insert("", "end", iid=str(i), values=(item, "", "", "", "0.00"))
+            for column, key in zip(self._TREE_COLUMNS[1:4], keys[:-1]):
+                self._cell_of[key] = (str(i), column)
+        self.tree.grid(row=0, column=0, columnspan=5, padx=4, pady=2, sticky="ew")
+        # Costo de cada fila como número (None si hay un error de conversión);
+        # el texto con formato solo existe en la celda
+        self._costs: List[Optional[float]] = [0.0] * len(self.research_items)
+        
+        # Editor de celdas Home, Professional y Precio Unitario, recorridas fila
+        # por fila; los costos se actualizan mientras se escribe
+        self._editor = TreeCellEditor(
+            self.tree, self._values, self._cell_of, self._values, on_change=self._schedule_calc
+        )
         
         # Total de costos
         ttk.Label(frame, text=TEXTS["total_cost_label"], style="Bold.TLabel").grid(
-            row=len(self.research_items)+1, column=0, columnspan=4, padx=4, pady=6, sticky="w"
+            row=1, column=0, columnspan=4, padx=4, pady=6, sticky="w"
         )
         self._create_calculated_label(frame, "total_costo_inversiones").grid(
-            row=len(self.research_items)+1, column=4, padx=2, pady=6, sticky="ew"
+            row=1, column=4, padx=2, pady=6, sticky="ew"
         )
     
     def _create_action_buttons(self):
@@ -227,8 +250,7 @@ class MarketResearchUI(tk.Toplevel):
         frame.pack(fill="x", padx=10, pady=10)
         
         # Configurar columnas con peso igual
-        for i in range(3):
-            frame.columnconfigure(i, weight=1)
+        configure_columns(frame, range(3))
         
         # Botones
         ttk.Button(
@@ -249,13 +271,6 @@ class MarketResearchUI(tk.Toplevel):
             command=self._on_closing
         ).grid(row=0, column=2, padx=5, pady=5, sticky="ew")
     
-    def _create_entry(self, parent, key: str) -> ttk.Entry:
-        """Crea un campo de entrada y registra su variable."""
-        var = tk.StringVar()
-        self.entry_vars[key] = var
-        var.trace_add("write", lambda *_: self._calculate_costs())
-        return ttk.Entry(parent, width=12, textvariable=var)
-    
     def _create_calculated_label(self, parent, key: str) -> ttk.Label:
         """Crea una etiqueta para valores calculados."""
         var = tk.StringVar(value="0.00")
@@ -271,50 +286,50 @@ class MarketResearchUI(tk.Toplevel):
     #  Lógica de Negocio
     # ────────────────────────────────────────────────────────────────────────────────
     
-    def _generate_field_key(self, item: str, field: str) -> str:
-        """Genera una clave única para cada campo."""
-        return f"mr_{item.replace(' ', '_').replace('.', '').replace('-', '_')}_{field}"
+    def _schedule_calc(self):
+        """Agrupa las escrituras seguidas en un solo recálculo de costos."""
+        if self._calc_after_id:
+            self.after_cancel(self._calc_after_id)
+        self._calc_after_id = self.after(50, self._calculate_costs)
     
     def _calculate_costs(self):
         """Calcula los costos basados en los valores ingresados."""
+        if self._calc_after_id:
+            self.after_cancel(self._calc_after_id)
+            self._calc_after_id = None
         total = 0.0
+        values = self._values
+        costs = self._costs
         
-        for item in self.research_items:
+        for i, (kh, kp, ku, _) in enumerate(self._item_keys):
             try:
-                # Obtener claves para los campos relevantes
-                key_home = self._generate_field_key(item, "Home")
-                key_pro = self._generate_field_key(item, "Professional")
-                key_unit = self._generate_field_key(item, "Precio Unitario")
-                key_cost = self._generate_field_key(item, "Costo")
-                
-                # Obtener valores (0 si está vacío o no es número)
-                h = float(self.entry_vars[key_home].get() or 0)
-                p = float(self.entry_vars[key_pro].get() or 0)
-                u = float(self.entry_vars[key_unit].get() or 0)
-                
-                # Calcular costo y actualizar
-                costo = (h * u) + (p * u)
-                self.calculated_vars[key_cost].set(f"{costo:,.2f}")
-                total += costo
+                # Obtener valores (0 si está vacío)
+                h = _to_float(values[kh])
+                p = _to_float(values[kp])
+                u = _to_float(values[ku])
             except ValueError:
                 # Manejar errores de conversión
-                self.calculated_vars[key_cost].set("Error")
+                costo = None
+            else:
+                # Calcular costo
+                costo = (h * u) + (p * u)
+                total += costo
+            # Solo se formatea y se toca la celda si el costo cambió
+            if costo != costs[i]:
+                costs[i] = costo
+                self.tree.set(str(i), "cost", "Error" if costo is None else f"{costo:,.2f}")
         
         # Actualizar total
         self.calculated_vars["total_costo_inversiones"].set(f"{total:,.2f}")
     
     def _save_data(self):
         """Guarda los datos de investigación de mercado."""
-        # Preparar los datos para guardar
-        data = {
-            "market_research": {
-                **{k: v.get() for k, v in self.entry_vars.items()},
-                **{k: v.get() for k, v in self.calculated_vars.items()}
-            }
-        }
+        # Tomar una edición en curso y aplicar un recálculo pendiente
+        self._editor.commit()
+        self._calculate_costs()
         
         # Guardar en la base de datos
-        if self.db.save_decision(self.company_id, self.period, data):
+        if self.db.save_market_research(self.company_id, self.period, self._values):
             messagebox.showinfo(
                 TEXTS["save_success"],
                 parent=self
@@ -327,40 +342,83 @@ class MarketResearchUI(tk.Toplevel):
             )
     
     def _load_data(self):
-        """Carga los datos de investigación de mercado."""
-        data = self.db.load_decision(self.company_id, self.period)
-        if not data or "market_research" not in data:
+        """Lee en segundo plano los datos de investigación de mercado."""
+        future = self._io.submit(self.db.load_market_research, self.company_id, self.period)
+        self._load_poll_id = self.after(20, self._poll_load, future)
+    
+    def _poll_load(self, future):
+        """Espera en el hilo de Tk a que termine la lectura y la aplica."""
+        if not future.done():
+            self._load_poll_id = self.after(20, self._poll_load, future)
+            return
+        self._load_poll_id = None
+        try:
+            data = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo cargar los datos: {e}", parent=self)
+            return
+        self._apply_loaded(data)
+    
+    def _apply_loaded(self, data: Optional[Dict]):
+        """Muestra en la tabla los datos leídos."""
+        if not data:
             self._clear_fields()
             return
         
-        research_data = data["market_research"]
-        
-        # Cargar valores en los campos
-        for key, var in self.entry_vars.items():
-            if key in research_data:
-                var.set(research_data[key])
-        
-        # Cargar valores calculados
-        for key, var in self.calculated_vars.items():
-            if key in research_data:
-                try:
-                    value = float(research_data[key].replace(",", "")) if research_data[key] else 0.0
-                    var.set(f"{value:,.2f}")
-                except (ValueError, AttributeError):
-                    var.set(research_data[key])
-        
-        # Recalcular costos
-        self._calculate_costs()
+        self._fill_table(data)
     
     def _clear_fields(self):
         """Limpia todos los campos del formulario."""
-        for var in self.entry_vars.values():
-            var.set("")
+        self._fill_table(dict.fromkeys(self._values, ""))
+    
+    def _fill_table(self, research_data: Dict):
+        """Aplica los valores dados y recalcula los costos en una sola pasada.
+        
+        Los campos que no aparecen en research_data conservan su valor; cada
+        fila se actualiza con una sola llamada a la tabla.
+        """
+        # Las celdas no tienen traces, así que llenar la tabla no dispara
+        # recálculos; solo se descarta el que deja pendiente el editor.
+        self._editor.cancel()
+        if self._calc_after_id:
+            self.after_cancel(self._calc_after_id)
+            self._calc_after_id = None
+        total = 0.0
+        values = self._values
+        costs = self._costs
+        
+        for i, (item, (kh, kp, ku, _)) in enumerate(zip(self.research_items, self._item_keys)):
+            text_home = values[kh] = _cell_text(research_data.get(kh, values[kh]))
+            text_pro = values[kp] = _cell_text(research_data.get(kp, values[kp]))
+            text_unit = values[ku] = _cell_text(research_data.get(ku, values[ku]))
+            try:
+                h = _to_float(text_home)
+                p = _to_float(text_pro)
+                u = _to_float(text_unit)
+            except ValueError:
+                costo = None
+            else:
+                costo = (h * u) + (p * u)
+                total += costo
+            costs[i] = costo
+            self.tree.item(str(i), values=(
+                item, text_home, text_pro, text_unit,
+                "Error" if costo is None else f"{costo:,.2f}"
+            ))
         
-        for var in self.calculated_vars.values():
-            var.set("0.00")
+        self.calculated_vars["total_costo_inversiones"].set(f"{total:,.2f}")
     
     def _on_closing(self):
         """Maneja el cierre de la ventana."""
         self.destroy()
         self.parent_app.show_main_menu()
+    
+    def destroy(self):
+        # Aquí y no en _on_closing: al cerrar con la X, main._on_child_closing
+        # solo llama a destroy()
+        if self._calc_after_id:
+            self.after_cancel(self._calc_after_id)
+        if self._load_poll_id:
+            self.after_cancel(self._load_poll_id)
+        self._io.shutdown(wait=True)
+        super().destroy()
@@ -1,56 +1,14 @@
 # modelohome.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import sqlite3
 import logging
-from pathlib import Path
-from typing import Dict, Optional, Any
+from Interfaces.db import get_shared
 
 # ------------------------- Configuración Inicial -------------------------
 logger = logging.getLogger(__name__)
 
-# ------------------------- Modelo -------------------------
-class ModeloHomeModel:
-    """Modelo para manejar los datos del Modelo HOME."""
-    
-    def __init__(self, db_file: Path):
-        self.db_file = db_file
-        
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
-            
-    def save_modelo_data(self, company_id: int, period: int, data: Dict[str, Any]) -> bool:
-        """Guarda los datos del modelo HOME en la base de datos."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "REPLACE INTO financial_statement (company_id, period, type, data) VALUES (?, ?, ?, ?)",
-                    (company_id, period, "MODELO_HOME", json.dumps(data))
-                )
-                conn.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Error saving modelo HOME data: {str(e)}")
-            return False
-            
-    def load_modelo_data(self, company_id: int, period: int) -> Optional[Dict[str, Any]]:
-        """Carga los datos del modelo HOME desde la base de datos."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?",
-                    (company_id, period, "MODELO_HOME")
-                )
-                row = cursor.fetchone()
-                return json.loads(row["data"]) if row else None
-        except Exception as e:
-            logger.error(f"Error loading modelo HOME data: {str(e)}")
-            return None
+# Tipo de los datos del Modelo HOME en financial_statement
+MODELO_HOME_TYPE = "MODELO_HOME"
 
 # ------------------------- Vista -------------------------
 class ModeloHomeUI(tk.Toplevel):
@@ -63,15 +21,15 @@ class ModeloHomeUI(tk.Toplevel):
         self.company_name_str = company_name
         self.period_int = period
         
-        # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = ModeloHomeModel(db_file)
+        # Manejador de base de datos compartido
+        self.db = get_shared()
         
         # Inicializar variables
         self.entry_vars = {}
         
         self._setup_ui()
         self._load_initial_data()
+        self.protocol("WM_DELETE_WINDOW", self._on_closing)
         
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -201,7 +159,7 @@ class ModeloHomeUI(tk.Toplevel):
         
     def _load_initial_data(self):
         """Carga los datos iniciales desde la base de datos."""
-        modelo_data = self.model.load_modelo_data(self.company_id, self.period_int)
+        modelo_data = self.db.load_financial(self.company_id, self.period_int, MODELO_HOME_TYPE)
         
         if modelo_data:
             for key, var in self.entry_vars.items():
@@ -230,7 +188,7 @@ class ModeloHomeUI(tk.Toplevel):
                 except ValueError:
                     data[key] = value  # Mantener como cadena si no es convertible
 
-            if self.model.save_modelo_data(self.company_id, self.period_int, data):
+            if self.db.save_financial(self.company_id, self.period_int, MODELO_HOME_TYPE, data):
                 messagebox.showinfo("Éxito", 
                                   f"Datos del Modelo HOME guardados para el período {self.period_int}")
             else:
@@ -1,34 +1,112 @@
 # modeloprofessional.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import sqlite3
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Iterable, Optional, Any, Tuple
+from Interfaces.db import DB_FILE, close_connection, connect, loads, optimize_connection, shared_instance
+from Interfaces.widgets import ScrollableFrame, StatusLabel
 
 logger = logging.getLogger(__name__)
 
+
+# Campos específicos del Professional: (clave, etiqueta)
+_FIELDS = (
+    ("ventas_pagadas", "Ventas Pagadas"),
+    ("deudores_ventas", "Deudores por ventas"),
+    ("ventas_metas", "Ventas Metas $"),
+    ("impto_compra_venta", "Impo Compra-Venta"),
+    ("prelucido", "Prelúcido"),
+    ("promociones", "Promociones"),
+    ("compras_pagadas", "COMPRAS PAGADAS"),
+    ("compras_por_pagar", "COMPRAS POR PAGAR"),
+    ("stock_final_prod_terminados", "Stock Final Prod Terminados NB"),
+    ("produccion_periodo", "Producción del período"),
+    ("stock_trans_munt", "Stock Trans Munt"),
+    ("stock_kits_professional", "Stock KITS PROFESSIONAL"),
+    ("stock_ppa_professional", "Stock PPA PROFESSIONAL"),
+    ("precio_kit1_professional", "PRECIO KIT I PROFESSIONAL"),
+    ("precio_kit2_professional", "PRECIO KIT 2 PROFESSIONAL"),
+)
+
+# Columnas de modelo_professional, en el orden del formulario
+_MODELO_COLUMNS = tuple(key for key, _ in _FIELDS)
+
+# Sentencias del modelo; con texto constante SQLite reutiliza la sentencia preparada.
+# El upsert actualiza la fila en su lugar en vez de borrarla y reinsertarla como REPLACE.
+_SQL_SAVE_MODELO = (
+    f"INSERT INTO modelo_professional (company_id, period, {', '.join(_MODELO_COLUMNS)}) "
+    f"VALUES (?, ?, {', '.join('?' * len(_MODELO_COLUMNS))}) "
+    "ON CONFLICT (company_id, period) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _MODELO_COLUMNS)
+)
+_SQL_LOAD_MODELO = f"SELECT {', '.join(_MODELO_COLUMNS)} FROM modelo_professional WHERE company_id = ? AND period = ?"
+_SQL_LOAD_MODELO_JSON = "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?"
+
+# Una fila por empresa y período. Con afinidad NUMERIC los enteros del
+# formulario se guardan como INTEGER y el texto no numérico queda como texto.
+_MODELO_PROFESSIONAL_DDL = """
+    CREATE TABLE IF NOT EXISTS modelo_professional (
+        company_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        ventas_pagadas NUMERIC,
+        deudores_ventas NUMERIC,
+        ventas_metas NUMERIC,
+        impto_compra_venta NUMERIC,
+        prelucido NUMERIC,
+        promociones NUMERIC,
+        compras_pagadas NUMERIC,
+        compras_por_pagar NUMERIC,
+        stock_final_prod_terminados NUMERIC,
+        produccion_periodo NUMERIC,
+        stock_trans_munt NUMERIC,
+        stock_kits_professional NUMERIC,
+        stock_ppa_professional NUMERIC,
+        precio_kit1_professional NUMERIC,
+        precio_kit2_professional NUMERIC,
+        PRIMARY KEY (company_id, period)
+    ) WITHOUT ROWID;
+"""
+
 class ModeloProfessionalModel:
     """Modelo para manejar los datos del Modelo Professional."""
     
     def __init__(self, db_file: Path):
         self.db_file = db_file
+        # Una sola conexión, abierta en el primer uso y reutilizada
+        self._conn: Optional[sqlite3.Connection] = None
         
     def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
+        if self._conn is None:
+            self._conn = self._open_connection()
+        return self._conn
+    
+    def optimize(self):
+        optimize_connection(self._conn)
+    
+    def close(self):
+        """Cierra la conexión si está abierta."""
+        close_connection(self._conn)
+        self._conn = None
+    
+    def _open_connection(self):
+        conn = connect(self.db_file, row_factory=sqlite3.Row)
+        conn.execute(_MODELO_PROFESSIONAL_DDL)
         return conn
             
     def save_modelo_data(self, company_id: int, period: int, data: Dict[str, Any]) -> bool:
+        return self.save_many([(company_id, period, data)])
+    
+    def save_many(self, rows: Iterable[Tuple[int, int, Dict[str, Any]]]) -> bool:
+        """Guarda varios (company_id, period, data) en una sola transacción."""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "REPLACE INTO financial_statement (company_id, period, type, data) VALUES (?, ?, ?, ?)",
-                    (company_id, period, "MODELO_PROFESSIONAL", json.dumps(data))
+                conn.executemany(
+                    _SQL_SAVE_MODELO,
+                    ((company_id, period, *map(data.get, _MODELO_COLUMNS))
+                     for company_id, period, data in rows)
                 )
-                conn.commit()
                 return True
         except Exception as e:
             logger.error(f"Error saving modelo PROFESSIONAL data: {str(e)}")
@@ -37,20 +115,32 @@ class ModeloProfessionalModel:
     def load_modelo_data(self, company_id: int, period: int) -> Optional[Dict[str, Any]]:
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT data FROM financial_statement WHERE company_id = ? AND period = ? AND type = ?",
+                row = conn.execute(_SQL_LOAD_MODELO, (company_id, period)).fetchone()
+                if row is not None:
+                    return {key: value for key, value in zip(_MODELO_COLUMNS, row) if value is not None}
+                
+                # Datos guardados antes de existir modelo_professional
+                row = conn.execute(
+                    _SQL_LOAD_MODELO_JSON,
                     (company_id, period, "MODELO_PROFESSIONAL")
-                )
-                row = cursor.fetchone()
-                return json.loads(row["data"]) if row else None
+                ).fetchone()
+                return loads(row["data"]) if row else None
         except Exception as e:
             logger.error(f"Error loading modelo PROFESSIONAL data: {str(e)}")
             return None
 
+def shared_model(parent_app) -> ModeloProfessionalModel:
+    """Devuelve el modelo de la aplicación, creándolo la primera vez."""
+    return shared_instance(parent_app, "modelo_professional_model", lambda: ModeloProfessionalModel(DB_FILE))
+
 class ModeloProfessionalUI(tk.Toplevel):
     """Interfaz gráfica para el Modelo Professional."""
     
+    _STYLES_DONE = False
+    
+    # Alto inicial de la ventana; si el formulario cabe, no se usa el canvas desplazable
+    _WINDOW_HEIGHT = 600
+    
     def __init__(self, parent_app, company_id: int, company_name: str, period: int):
         super().__init__(parent_app)
         self.parent_app = parent_app
@@ -58,20 +148,22 @@ class ModeloProfessionalUI(tk.Toplevel):
         self.company_name_str = company_name
         self.period_int = period
         
-        # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = ModeloProfessionalModel(db_file)
+        # Configurar modelo (compartido entre ventanas)
+        self.model = shared_model(parent_app)
         
         # Inicializar variables
         self.entry_vars = {}
         
         self._setup_ui()
+        # Pares (clave, variable) en el orden del formulario, para save_data
+        self._entry_items = tuple(self.entry_vars.items())
         self._load_initial_data()
         
     def _setup_ui(self):
         self.title("Modelo PROFESSIONAL")
-        self.geometry("500x600")
+        self.geometry(f"500x{self._WINDOW_HEIGHT}")
         self.resizable(True, True)
+        self.protocol("WM_DELETE_WINDOW", self._on_closing)
         
         self._configure_styles()
         self._create_scrollable_frame()
@@ -80,6 +172,8 @@ class ModeloProfessionalUI(tk.Toplevel):
         self._create_buttons()
         
     def _configure_styles(self):
+        if ModeloProfessionalUI._STYLES_DONE:
+            return
         style = ttk.Style()
         style.theme_use('clam')
         style.configure('TFrame', background='#DCDAD5')
@@ -94,20 +188,10 @@ class ModeloProfessionalUI(tk.Toplevel):
         style.configure('Header.TLabel', font=('Inter', 14, 'bold'), background='#DCDAD5')
         style.configure('Section.TLabel', font=('Inter', 11, 'bold'), background='#DCDAD5')
         style.configure('Bold.TLabel', font=('Inter', 10, 'bold'))
+        ModeloProfessionalUI._STYLES_DONE = True
         
     def _create_scrollable_frame(self):
-        self.main_canvas = tk.Canvas(self, bg='#DCDAD5')
-        self.main_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.main_canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.main_canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.main_canvas.configure(scrollregion=self.main_canvas.bbox("all")))
-        
-        self.main_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.main_canvas.configure(yscrollcommand=self.main_scrollbar.set)
-        self.main_canvas.pack(side="left", fill="both", expand=True)
-        self.main_scrollbar.pack(side="right", fill="y")
+        self.scrollable_frame = ScrollableFrame(self, fit_height=self._WINDOW_HEIGHT).frame
         
     def _create_header(self):
         header_frame = ttk.Frame(self.scrollable_frame, padding=(10, 10))
@@ -137,36 +221,16 @@ class ModeloProfessionalUI(tk.Toplevel):
         section_frame = ttk.Frame(self.scrollable_frame, padding=(10, 10))
         section_frame.pack(fill="x", padx=10, pady=10)
         
-        # Campos específicos del Professional
-        fields = [
-            ("ventas_pagadas", "Ventas Pagadas"),
-            ("deudores_ventas", "Deudores por ventas"),
-            ("ventas_metas", "Ventas Metas $"),
-            ("impto_compra_venta", "Impo Compra-Venta"),
-            ("prelucido", "Prelúcido"),
-            ("promociones", "Promociones"),
-            ("compras_pagadas", "COMPRAS PAGADAS"),
-            ("compras_por_pagar", "COMPRAS POR PAGAR"),
-            ("stock_final_prod_terminados", "Stock Final Prod Terminados NB"),
-            ("produccion_periodo", "Producción del período"),
-            ("stock_trans_munt", "Stock Trans Munt"),
-            ("stock_kits_professional", "Stock KITS PROFESSIONAL"),
-            ("stock_ppa_professional", "Stock PPA PROFESSIONAL"),
-            ("precio_kit1_professional", "PRECIO KIT I PROFESSIONAL"),
-            ("precio_kit2_professional", "PRECIO KIT 2 PROFESSIONAL"),
-        ]
-        
-        for i, (key, label) in enumerate(fields):
-            row_frame = ttk.Frame(section_frame)
-            row_frame.pack(fill="x", padx=5, pady=3)
-            
+        # Una sola grilla para todos los campos, sin un marco por fila
+        for i, (key, label) in enumerate(_FIELDS):
             # Etiqueta
-            ttk.Label(row_frame, text=label, width=30, anchor='w').grid(row=0, column=0, sticky='w')
+            ttk.Label(section_frame, text=label, width=30, anchor='w').grid(
+                row=i, column=0, sticky='w', padx=(5, 0), pady=3)
             
             # Entrada
             var = tk.StringVar(value="0")
-            entry = ttk.Entry(row_frame, textvariable=var, width=12)
-            entry.grid(row=0, column=1, padx=5)
+            entry = ttk.Entry(section_frame, textvariable=var, width=12)
+            entry.grid(row=i, column=1, sticky='w', padx=5, pady=3)
             self.entry_vars[key] = var
         
     def _create_buttons(self):
@@ -180,6 +244,11 @@ class ModeloProfessionalUI(tk.Toplevel):
         ttk.Button(button_frame, text="Volver al Menú Principal", 
                   command=self._on_closing).pack(side="right", padx=5, pady=5)
         
+        # Estado: confirma el guardado sin un diálogo modal
+        self.status = StatusLabel(self.scrollable_frame)
+        self.status.pack(
+            fill="x", padx=20, pady=(0, 10))
+        
     def _load_initial_data(self):
         modelo_data = self.model.load_modelo_data(self.company_id, self.period_int)
         
@@ -194,16 +263,18 @@ class ModeloProfessionalUI(tk.Toplevel):
     def save_data(self):
         try:
             data = {}
-            for key, var in self.entry_vars.items():
+            for key, var in self._entry_items:
                 value = var.get()
+                if not value:
+                    data[key] = 0
+                    continue
                 try:
-                    data[key] = int(value) if value else 0
+                    data[key] = int(value)
                 except ValueError:
                     data[key] = value
 
             if self.model.save_modelo_data(self.company_id, self.period_int, data):
-                messagebox.showinfo("Éxito", 
-                                  f"Datos del Modelo PROFESSIONAL guardados para el período {self.period_int}")
+                self.status.show(f"Datos del Modelo PROFESSIONAL guardados para el período {self.period_int}")
             else:
                 messagebox.showerror("Error", "Error al guardar los datos en la base de datos")
         except Exception as e:
@@ -211,6 +282,8 @@ class ModeloProfessionalUI(tk.Toplevel):
             messagebox.showerror("Error", f"Error al guardar: {str(e)}")
     
     def _on_closing(self):
+        # La conexión es compartida y queda abierta para la próxima ventana
+        self.model.optimize()
         self.destroy()
         self.parent_app.show_main_menu()
 
@@ -1,15 +1,49 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import sqlite3
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Iterable, Optional, Any, Tuple
+from Interfaces.db import DB_FILE, DEFAULT_PRODUCT_TYPE, SQL_LOAD_DECISION, close_connection, connect, loads, optimize_connection, shared_instance
+from Interfaces.widgets import ScrollableFrame, StatusLabel
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Configuración y Constantes
 # ────────────────────────────────────────────────────────────────────────────────
 
-DB_FILE = Path(__file__).parent.parent / "captop.db"
+
+# Columnas de loan_decision, en el orden de la tabla
+_LOAN_COLUMNS = ("long_term_amount", "loan_term", "grace_period", "short_term_amount", "credit_line_amount")
+
+# Sentencias del manejador; con texto constante SQLite reutiliza la sentencia preparada
+_SQL_SAVE_LOAN = (
+    "INSERT INTO loan_decision (company_id, period, long_term_amount, loan_term, grace_period, "
+    "short_term_amount, credit_line_amount) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (company_id, period) DO UPDATE SET "
+    "long_term_amount = excluded.long_term_amount, loan_term = excluded.loan_term, "
+    "grace_period = excluded.grace_period, short_term_amount = excluded.short_term_amount, "
+    "credit_line_amount = excluded.credit_line_amount"
+)
+_SQL_LOAD_LOAN = (
+    "SELECT long_term_amount, loan_term, grace_period, short_term_amount, credit_line_amount "
+    "FROM loan_decision WHERE company_id = ? AND period = ?"
+)
+
+# Separadores de miles que se quitan antes de convertir un monto
+_STRIP_COMMA = str.maketrans('', '', ',')
+
+# Una fila por empresa y período con las decisiones de préstamo como REAL
+_LOAN_DECISION_DDL = """
+    CREATE TABLE IF NOT EXISTS loan_decision (
+        company_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        long_term_amount REAL,
+        loan_term REAL,
+        grace_period REAL,
+        short_term_amount REAL,
+        credit_line_amount REAL,
+        PRIMARY KEY (company_id, period)
+    ) WITHOUT ROWID;
+"""
 
 # Textos para internacionalización
 TEXTS = {
@@ -41,38 +75,64 @@ class DatabaseManager:
     
     def __init__(self, db_file: Path):
         self.db_file = db_file
+        # Una sola conexión, abierta en el primer uso y reutilizada
+        self._conn: Optional[sqlite3.Connection] = None
     
     def get_connection(self):
-        """Devuelve una conexión SQLite con filas accesibles por nombre."""
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
+        """Devuelve la conexión SQLite (filas accesibles por nombre), abriéndola la primera vez."""
+        if self._conn is None:
+            self._conn = self._open_connection()
+        return self._conn
+    
+    def optimize(self):
+        optimize_connection(self._conn)
+    
+    def close(self):
+        """Cierra la conexión si está abierta."""
+        close_connection(self._conn)
+        self._conn = None
+    
+    def _open_connection(self):
+        conn = connect(self.db_file, row_factory=sqlite3.Row)
+        conn.execute(_LOAN_DECISION_DDL)
         return conn
     
-    def save_decision(self, company_id: int, period: int, payload: Dict) -> bool:
-        """Guarda las decisiones en la base de datos."""
+    def save_loan_decisions(self, company_id: int, period: int, data: Dict[str, Optional[float]]) -> bool:
+        """Guarda las decisiones de préstamo del período."""
+        return self.save_many([(company_id, period, data)])
+    
+    def save_many(self, rows: Iterable[Tuple[int, int, Dict[str, Optional[float]]]]) -> bool:
+        """Guarda varios (company_id, period, data) en loan_decision, en una sola transacción."""
         with self.get_connection() as conn:
             try:
-                cur = conn.cursor()
-                cur.execute(
-                    "REPLACE INTO decision (company_id, period, payload) VALUES (?, ?, ?)",
-                    (company_id, period, json.dumps(payload))
+                conn.executemany(
+                    _SQL_SAVE_LOAN,
+                    ((company_id, period, *map(data.get, _LOAN_COLUMNS))
+                     for company_id, period, data in rows)
                 )
                 conn.commit()
                 return True
             except sqlite3.Error as e:
+                # Sin esto, la salida del with confirmaría las filas ya escritas
+                conn.rollback()
                 messagebox.showerror(TEXTS["error"], f"Error de base de datos: {str(e)}")
                 return False
     
-    def load_decision(self, company_id: int, period: int) -> Optional[Dict]:
-        """Carga las decisiones desde la base de datos."""
+    def load_loan_decisions(self, company_id: int, period: int) -> Optional[Dict[str, Optional[float]]]:
+        """Carga las decisiones de préstamo del período, o None si no hay datos."""
         with self.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT payload FROM decision WHERE company_id = ? AND period = ?",
-                (company_id, period)
-            )
-            row = cur.fetchone()
-            return json.loads(row["payload"]) if row else None
+            row = conn.execute(_SQL_LOAD_LOAN, (company_id, period)).fetchone()
+            if row is not None:
+                return dict(zip(_LOAN_COLUMNS, row))
+            
+            # Decisiones guardadas antes de existir loan_decision
+            row = conn.execute(SQL_LOAD_DECISION, (company_id, period, DEFAULT_PRODUCT_TYPE)).fetchone()
+            # Una fila sin loan_decisions tampoco tiene datos de préstamo
+            return loads(row["payload"]).get("loan_decisions") if row else None
+
+def shared_manager(parent_app) -> DatabaseManager:
+    """Devuelve el manejador de la aplicación, creándolo la primera vez."""
+    return shared_instance(parent_app, "loan_db_manager", lambda: DatabaseManager(DB_FILE))
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Vista - Interfaz de Usuario
@@ -81,17 +141,26 @@ class DatabaseManager:
 class LoanDecisionsUI(tk.Toplevel):
     """Interfaz gráfica para la sección de Decisiones de Financiamiento."""
     
+    _STYLES_DONE = False
+    
+    # Alto inicial de la ventana; si el formulario cabe, no se usa el canvas desplazable
+    _WINDOW_HEIGHT = 650
+    
+    # Opciones de los combobox de largo plazo
+    _LOAN_TERM_OPTIONS = tuple(str(i) for i in range(2, 9))  # 2 a 8 años
+    _GRACE_PERIOD_OPTIONS = ("0", "1", "2")
+    
     def __init__(self, parent_app, company_id: int, company_name: str, period: int):
         super().__init__(parent_app)
         self.parent_app = parent_app
         self.company_id = company_id
         self.company_name = company_name
         self.period = period
-        self.db = DatabaseManager(DB_FILE)
+        self.db = shared_manager(parent_app)
         
         # Configuración inicial de la ventana
         self.title(TEXTS["window_title"])
-        self.geometry("800x650")
+        self.geometry(f"800x{self._WINDOW_HEIGHT}")
         self.minsize(700, 550)
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
         
@@ -105,11 +174,13 @@ class LoanDecisionsUI(tk.Toplevel):
         # Crear widgets
         self._create_widgets()
         
-        # Cargar datos iniciales
-        self._load_data()
+        # Cargar datos iniciales, sin avisos al abrir la ventana
+        self._load_data(silent=True)
     
     def _configure_styles(self):
         """Configura los estilos visuales de la aplicación."""
+        if LoanDecisionsUI._STYLES_DONE:
+            return
         style = ttk.Style()
         style.theme_use('clam')
         style.configure('TFrame', background='#DCDAD5')
@@ -122,23 +193,12 @@ class LoanDecisionsUI(tk.Toplevel):
             foreground=[('active', 'black')]
         )
         style.configure('Centered.TLabel', anchor='center', font=('Inter', 12, 'bold'))
+        LoanDecisionsUI._STYLES_DONE = True
     
     def _create_widgets(self):
         """Crea todos los widgets de la interfaz."""
-        # Canvas desplazable
-        self.canvas = tk.Canvas(self, bg='#DCDAD5')
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        # Canvas desplazable, que se quita si el formulario cabe en la ventana
+        self.scrollable_frame = ScrollableFrame(self, fit_height=self._WINDOW_HEIGHT).frame
         
         # Sección de información de empresa y período
         self._create_company_info_section()
@@ -193,22 +253,20 @@ class LoanDecisionsUI(tk.Toplevel):
         # Plazo (años)
         ttk.Label(frame, text=TEXTS["term_label"]).grid(row=1, column=0, padx=5, pady=2, sticky='w')
         self.combo_vars["loan_term"] = tk.StringVar()
-        loan_term_options = [str(i) for i in range(2, 9)]  # 2 a 8 años
         ttk.Combobox(
             frame, 
             textvariable=self.combo_vars["loan_term"],
-            values=loan_term_options, 
+            values=self._LOAN_TERM_OPTIONS, 
             state="readonly"
         ).grid(row=1, column=1, padx=5, pady=2, sticky='ew')
         
         # Periodo Gracia
         ttk.Label(frame, text=TEXTS["grace_label"]).grid(row=2, column=0, padx=5, pady=2, sticky='w')
         self.combo_vars["grace_period"] = tk.StringVar()
-        grace_period_options = ["0", "1", "2"]
         ttk.Combobox(
             frame, 
             textvariable=self.combo_vars["grace_period"],
-            values=grace_period_options, 
+            values=self._GRACE_PERIOD_OPTIONS, 
             state="readonly"
         ).grid(row=2, column=1, padx=5, pady=2, sticky='ew')
     
@@ -265,13 +323,19 @@ class LoanDecisionsUI(tk.Toplevel):
             text=TEXTS["back_btn"], 
             command=self._on_closing
         ).grid(row=0, column=2, padx=5, pady=5, sticky='ew')
+        
+        # Estado: confirma el guardado sin un diálogo modal
+        self.status = StatusLabel(frame)
+        self.status.grid(
+            row=1, column=0, columnspan=3, padx=5, pady=(5, 0), sticky='ew'
+        )
     
     def _get_numeric_value(self, value_str: str) -> Optional[float]:
         """Convierte el valor a float o devuelve None si no es válido."""
         if not value_str:
             return None
         try:
-            return float(value_str.replace(',', ''))
+            return float(value_str.translate(_STRIP_COMMA))
         except ValueError:
             return None
     
@@ -286,25 +350,23 @@ class LoanDecisionsUI(tk.Toplevel):
             "credit_line_amount": self._get_numeric_value(self.entry_vars["credit_line_amount"].get()),
         }
         
-        # Cargar el payload existente para el período y actualizar solo las decisiones de préstamo
-        existing_data = self.db.load_decision(self.company_id, self.period) or {}
-        existing_data["loan_decisions"] = loan_decisions_data
-        
-        if self.db.save_decision(self.company_id, self.period, existing_data):
-            messagebox.showinfo(TEXTS["save_success"], TEXTS["save_success"])
+        if self.db.save_loan_decisions(self.company_id, self.period, loan_decisions_data):
+            self.status.show(TEXTS["save_success"])
         else:
             messagebox.showerror(TEXTS["error"], "No se pudieron guardar los datos.")
     
-    def _load_data(self):
-        """Carga los datos desde la base de datos."""
-        data = self.db.load_decision(self.company_id, self.period)
-        if not data:
-            messagebox.showinfo(TEXTS["no_data"], TEXTS["no_data"])
+    def _load_data(self, silent: bool = False):
+        """Carga los datos desde la base de datos.
+        
+        Con silent=True (carga al abrir la ventana) no se muestra ningún aviso.
+        """
+        loaded_data = self.db.load_loan_decisions(self.company_id, self.period)
+        if loaded_data is None:
+            if not silent:
+                messagebox.showinfo(TEXTS["no_data"], TEXTS["no_data"])
             self._clear_fields()
             return
         
-        loaded_data = data.get("loan_decisions", {})
-        
         # Rellenar los campos de entrada
         if "long_term_amount" in loaded_data:
             self.entry_vars["long_term_amount"].set(str(loaded_data["long_term_amount"] or ""))
@@ -321,7 +383,8 @@ class LoanDecisionsUI(tk.Toplevel):
         if "credit_line_amount" in loaded_data:
             self.entry_vars["credit_line_amount"].set(str(loaded_data["credit_line_amount"] or ""))
         
-        messagebox.showinfo(TEXTS["load_success"], TEXTS["load_success"])
+        if not silent:
+            messagebox.showinfo(TEXTS["load_success"], TEXTS["load_success"])
     
     def _clear_fields(self):
         """Limpia todos los campos del formulario."""
@@ -332,5 +395,7 @@ class LoanDecisionsUI(tk.Toplevel):
     
     def _on_closing(self):
         """Maneja el cierre de la ventana."""
+        # La conexión es compartida y queda abierta para la próxima ventana
+        self.db.optimize()
         self.destroy()
         self.parent_app.show_main_menu()
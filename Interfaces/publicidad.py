@@ -1,15 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import sqlite3
 from pathlib import Path
 from typing import Dict, Optional, Any, List
+from Interfaces.db import DB_FILE, DEFAULT_PRODUCT_TYPE, connect, dumps, loads
+from Interfaces.widgets import ScrollableFrame, TreeCellEditor
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Configuración y Constantes
 # ────────────────────────────────────────────────────────────────────────────────
 
-DB_FILE = Path(__file__).parent.parent / "captop.db"
 
 # Textos para internacionalización
 TEXTS = {
@@ -27,6 +27,25 @@ TEXTS = {
     "error": "Error",
 }
 
+COUNTRIES = ("Argentina", "Brasil", "Chile", "Colombia", "Mexico")
+MEDIA_TYPES = (
+    "Revista PC Actualidad", "Revista Multitiendas", "Diario Negocios y Economía",
+    "Diario Sensacionalista", "Televisión Abierta", "Televisión Pagada",
+    "Circuito ABC1", "Circuito C2C3", "Radio Adulto Joven", "Radio Noticias",
+    "Portal Tipo TERRA", "Portal Diario Electrónico",
+)
+
+# (medio, país, clave) de cada campo, fila por fila; las claves se arman una
+# sola vez al importar en lugar de en cada apertura de la ventana
+_ADV_KEYS = tuple(
+    (media, country, f"advertising_{media.replace(' ', '_').replace('.', '').replace('/', '_')}_{country}")
+    for media in MEDIA_TYPES for country in COUNTRIES
+)
+
+# Columnas de la tabla y celda (iid de la fila, columna) de cada clave
+_TREE_COLUMNS = ("media",) + COUNTRIES
+_CELL_OF = {key: (str(i // len(COUNTRIES)), country) for i, (_media, country, key) in enumerate(_ADV_KEYS)}
+
 # ────────────────────────────────────────────────────────────────────────────────
 #  Modelo - Manejo de Base de Datos
 # ────────────────────────────────────────────────────────────────────────────────
@@ -36,36 +55,78 @@ class DatabaseManager:
     
     def __init__(self, db_file: Path):
         self.db_file = db_file
+        # Una sola conexión, abierta en el primer uso y reutilizada
+        self._conn: Optional[sqlite3.Connection] = None
+        # Secciones leídas por (empresa, período, clave). Valen mientras
+        # PRAGMA data_version no cambie (ninguna otra conexión escribió);
+        # patch_decision las descarta.
+        self._cache: Dict[tuple, Optional[Dict]] = {}
+        self._cache_version: Optional[int] = None
     
     def get_connection(self):
-        """Devuelve una conexión SQLite con filas accesibles por nombre."""
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Devuelve la conexión SQLite (filas accesibles por nombre), abriéndola la primera vez."""
+        if self._conn is None:
+            # Sin transacciones implícitas: patch_decision abre la suya
+            self._conn = connect(self.db_file, row_factory=sqlite3.Row, isolation_level=None)
+        return self._conn
     
-    def save_decision(self, company_id: int, period: int, payload: Dict) -> bool:
-        """Guarda las decisiones en la base de datos."""
-        with self.get_connection() as conn:
+    def close(self):
+        """Cierra la conexión si está abierta."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        # data_version solo se compara dentro de una misma conexión
+        self._cache.clear()
+        self._cache_version = None
+    
+    def patch_decision(self, company_id: int, period: int, key: str, value: Any) -> bool:
+        """Guarda value bajo key en el payload de decisiones, conservando las demás claves.
+
+        La mezcla la hace SQLite con json_set, así que no hace falta leer el
+        payload antes de guardarlo.
+        """
+        conn = self.get_connection()
+        self._cache.clear()
+        try:
+            conn.execute("BEGIN")
             try:
-                cur = conn.cursor()
-                cur.execute(
-                    "REPLACE INTO decision (company_id, period, payload) VALUES (?, ?, ?)",
-                    (company_id, period, json.dumps(payload)))
-                conn.commit()
-                return True
-            except sqlite3.Error as e:
-                messagebox.showerror(TEXTS["error"], f"Error de base de datos: {str(e)}")
-                return False
+                conn.execute(
+                    "INSERT INTO decision (company_id, period, product_type, payload) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (company_id, period, product_type) "
+                    "DO UPDATE SET payload = json_set(payload, '$.' || ?, json(?))",
+                    (company_id, period, DEFAULT_PRODUCT_TYPE, dumps({key: value}), key, dumps(value)))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            return True
+        except sqlite3.Error as e:
+            messagebox.showerror(TEXTS["error"], f"Error de base de datos: {str(e)}")
+            return False
     
-    def load_decision(self, company_id: int, period: int) -> Optional[Dict]:
-        """Carga las decisiones desde la base de datos."""
-        with self.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT payload FROM decision WHERE company_id = ? AND period = ?",
-                (company_id, period))
-            row = cur.fetchone()
-            return json.loads(row["payload"]) if row else None
+    def load_subkey(self, company_id: int, period: int, key: str) -> Optional[Dict]:
+        """Carga solo el objeto guardado bajo key en el payload de decisiones.
+
+        Devuelve None si no hay decisiones para el período y un dict vacío si
+        el payload no tiene key; json_extract evita decodificar el resto.
+        """
+        conn = self.get_connection()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = version
+        
+        cache_key = (company_id, period, key)
+        if cache_key not in self._cache:
+            row = conn.execute(
+                "SELECT json_extract(payload, '$.' || ?) FROM decision "
+                "WHERE company_id = ? AND period = ? AND product_type = ?",
+                (key, company_id, period, DEFAULT_PRODUCT_TYPE)).fetchone()
+            if row is None:
+                self._cache[cache_key] = None
+            else:
+                self._cache[cache_key] = loads(row[0]) if row[0] is not None else {}
+        return self._cache[cache_key]
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  Vista - Interfaz de Usuario
@@ -74,6 +135,8 @@ class DatabaseManager:
 class AdvertisingUI(tk.Toplevel):
     """Interfaz gráfica para la sección de Publicidad."""
     
+    _STYLES_DONE = False
+    
     def __init__(self, parent_app, company_id: int, company_name: str, period: int):
         super().__init__(parent_app)
         self.parent_app = parent_app
@@ -91,8 +154,8 @@ class AdvertisingUI(tk.Toplevel):
         # Configurar estilos
         self._configure_styles()
         
-        # Variables de control
-        self.entry_vars: Dict[str, tk.StringVar] = {}
+        # Valor mostrado en cada celda de la tabla, por clave y en el orden de _ADV_KEYS
+        self._values: Dict[str, str] = {key: "" for _media, _country, key in _ADV_KEYS}
         
         # Crear widgets
         self._create_widgets()
@@ -102,6 +165,8 @@ class AdvertisingUI(tk.Toplevel):
     
     def _configure_styles(self):
         """Configura los estilos visuales de la aplicación."""
+        if AdvertisingUI._STYLES_DONE:
+            return
         style = ttk.Style()
         style.theme_use('clam')
         style.configure('TFrame', background='#DCDAD5')
@@ -113,22 +178,14 @@ class AdvertisingUI(tk.Toplevel):
             background=[('active', '#e0e0e0')],
             foreground=[('active', 'black')]
         )
+        style.configure('Treeview', font=('Inter', 10), rowheight=24)
+        style.configure('Treeview.Heading', font=('Inter', 10, 'bold'))
+        AdvertisingUI._STYLES_DONE = True
     
     def _create_widgets(self):
         """Crea todos los widgets de la interfaz."""
         # Canvas desplazable
-        self.canvas = tk.Canvas(self, bg='#DCDAD5')
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        self.scrollable_frame = ScrollableFrame(self).frame
         
         # Sección de información de empresa y período
         self._create_company_info_section()
@@ -170,37 +227,28 @@ class AdvertisingUI(tk.Toplevel):
         frame = ttk.LabelFrame(self.scrollable_frame, text=TEXTS["advertising_frame"], padding=(10, 5))
         frame.pack(fill="x", padx=10, pady=10)
 
-        countries = ["Argentina", "Brasil", "Chile", "Colombia", "Mexico"]
-        media_types = [
-            "Revista PC Actualidad", "Revista Multitiendas", "Diario Negocios y Economía",
-            "Diario Sensacionalista", "Televisión Abierta", "Televisión Pagada",
-            "Circuito ABC1", "Circuito C2C3", "Radio Adulto Joven", "Radio Noticias",
-            "Portal Tipo TERRA", "Portal Diario Electrónico"
-        ]
-        
-        frame.grid_columnconfigure(0, weight=1)  # Columna para los nombres de los medios
-        for i in range(1, len(countries) + 1):
-            frame.grid_columnconfigure(i, weight=1)
+        frame.columnconfigure(0, weight=1)
 
-        # Encabezados de columna (Países)
-        ttk.Label(frame, text="").grid(row=0, column=0, padx=5, pady=2)
-        for i, country in enumerate(countries):
-            ttk.Label(frame, text=country, font=('Inter', 10, 'bold')).grid(
-                row=0, column=1 + i, padx=5, pady=2
-            )
+        # Tabla: un solo Treeview dibuja la grilla de medios por país en vez de
+        # una entrada por celda; la fila i (medio i) tiene iid str(i)
+        self.tree = ttk.Treeview(
+            frame,
+            columns=_TREE_COLUMNS,
+            show="headings",
+            height=len(MEDIA_TYPES),
+            selectmode="browse"
+        )
+        self.tree.heading("media", text="")
+        self.tree.column("media", width=220, anchor="w", stretch=True)
+        for country in COUNTRIES:
+            self.tree.heading(country, text=country)
+            self.tree.column(country, width=120, anchor="e", stretch=True)
+        for r_idx, media in enumerate(MEDIA_TYPES):
+            self.tree.insert("", "end", iid=str(r_idx), values=(media,) + ("",) * len(COUNTRIES))
+        self.tree.grid(row=0, column=0, padx=4, pady=2, sticky="ew")
 
-        # Filas de entrada para cada tipo de medio
-        for r_idx, media in enumerate(media_types):
-            ttk.Label(frame, text=media, anchor='w', wraplength=120, justify='left').grid(
-                row=1 + r_idx, column=0, padx=5, pady=2, sticky='w'
-            )
-            for c_idx, country in enumerate(countries):
-                # Generar una clave única para cada campo de entrada
-                key = f"advertising_{media.replace(' ', '_').replace('.', '').replace('/', '_')}_{country}"
-                self.entry_vars[key] = tk.StringVar()
-                ttk.Entry(frame, textvariable=self.entry_vars[key]).grid(
-                    row=1 + r_idx, column=1 + c_idx, padx=2, pady=2, sticky='ew'
-                )
+        # Editor de celdas de país, recorridas fila por fila
+        self._editor = TreeCellEditor(self.tree, self._values, _CELL_OF, self._values)
     
     def _create_action_buttons(self):
         """Crea los botones de acción en la parte inferior."""
@@ -241,46 +289,56 @@ class AdvertisingUI(tk.Toplevel):
     
     def _save_data(self):
         """Guarda los datos en la base de datos."""
-        # Recopilar todos los datos de entrada
+        # Tomar una edición en curso y recopilar todos los datos de la tabla
+        self._editor.commit()
         advertising_data = {}
-        for key, var in self.entry_vars.items():
-            advertising_data[key] = self._get_numeric_value(var.get())
+        for key, value in self._values.items():
+            advertising_data[key] = self._get_numeric_value(value)
         
-        # Cargar el payload existente para el período y actualizar solo las decisiones de publicidad
-        existing_data = self.db.load_decision(self.company_id, self.period) or {}
-        existing_data["advertising_decisions"] = advertising_data
-        
-        if self.db.save_decision(self.company_id, self.period, existing_data):
+        # Actualizar solo las decisiones de publicidad dentro del payload del período
+        if self.db.patch_decision(self.company_id, self.period, "advertising_decisions", advertising_data):
             messagebox.showinfo(TEXTS["save_success"], TEXTS["save_success"])
         else:
             messagebox.showerror(TEXTS["error"], "No se pudieron guardar los datos.")
     
     def _load_data(self):
         """Carga los datos desde la base de datos."""
-        data = self.db.load_decision(self.company_id, self.period)
-        if not data:
+        loaded_data = self.db.load_subkey(self.company_id, self.period, "advertising_decisions")
+        if loaded_data is None:
             messagebox.showinfo(TEXTS["no_data"], TEXTS["no_data"])
             self._clear_fields()
             return
         
-        loaded_data = data.get("advertising_decisions", {})
-        
-        # Rellenar los campos de entrada
-        for key, var in self.entry_vars.items():
-            if key in loaded_data and loaded_data[key] is not None:
-                var.set(str(loaded_data[key]))
-            else:
-                var.set("")
+        # Rellenar la tabla
+        self._fill_table(loaded_data)
         
         messagebox.showinfo(TEXTS["load_success"], TEXTS["load_success"])
     
     def _clear_fields(self):
         """Limpia todos los campos del formulario."""
-        for var in self.entry_vars.values():
-            var.set("")
+        self._fill_table({})
+    
+    def _fill_table(self, loaded_data: Dict[str, Any]):
+        """Muestra los valores dados (vacío si faltan), con una llamada a la tabla por fila."""
+        self._editor.cancel()
+        values = self._values
+        n = len(COUNTRIES)
+        for r_idx, media in enumerate(MEDIA_TYPES):
+            row = [media]
+            for _media, _country, key in _ADV_KEYS[r_idx * n:(r_idx + 1) * n]:
+                value = loaded_data.get(key)
+                values[key] = "" if value is None else str(value)
+                row.append(values[key])
+            self.tree.item(str(r_idx), values=row)
     
     def _on_closing(self):
         """Maneja el cierre de la ventana."""
         self.destroy()
         self.parent_app.show_main_menu()
+    
+    def destroy(self):
+        # Aquí y no en _on_closing: al cerrar con la X, main._on_child_closing
+        # solo llama a destroy()
+        self.db.close()
+        super().destroy()
 
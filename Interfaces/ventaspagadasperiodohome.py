@@ -6,6 +6,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 logger = logging.getLogger(__name__)
 
@@ -59,8 +60,7 @@ class VentasPagadasUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = VentasPagadasModel(db_file)
+        self.model = VentasPagadasModel(DB_FILE)
         
         # Inicializar variables
         self.entry_vars = {}
@@ -6,6 +6,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from typing import Dict, Optional, Any
+from Interfaces.db import DB_FILE
 
 # ------------------------- Configuración Inicial -------------------------
 logger = logging.getLogger(__name__)
@@ -73,8 +74,7 @@ class SalesByCountryUI(tk.Toplevel):
         self.period_int = period
         
         # Configurar modelo
-        db_file = Path(__file__).parent.parent / "captop.db"
-        self.model = SalesByCountryModel(db_file)
+        self.model = SalesByCountryModel(DB_FILE)
         
         # Inicializar variables
         self.entry_vars = {}
@@ -0,0 +1,188 @@
+# widgets.py
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Utilidades de interfaz compartidas por los módulos de Interfaces
+# ────────────────────────────────────────────────────────────────────────────────
+
+def configure_columns(frame, columns: Iterable[int], weight: int = 1):
+    """Configura el peso de varias columnas de un grid con una sola llamada a Tcl."""
+    frame.tk.call('grid', 'columnconfigure', frame._w, list(columns), '-weight', weight)
+
+
+class ScrollableFrame:
+    """Canvas con barra vertical y un marco interior (frame) que se desplaza.
+
+    Varios <Configure> seguidos del marco (p. ej. al arrastrar el borde) se
+    agrupan en una sola actualización de scrollregion.
+
+    Con fit_height, si el marco cabe en ese alto (y en la pantalla) se quitan
+    el canvas y la barra y el marco se empaca directamente en parent.
+    """
+
+    def __init__(self, parent, bg: str = '#DCDAD5', fit_height: Optional[int] = None):
+        self.canvas = tk.Canvas(parent, bg=bg)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        # Con fit_height el marco es hijo de parent y no del canvas, para poder
+        # empacarlo directamente en él si resulta que no hace falta desplazar
+        self.frame = ttk.Frame(parent if fit_height else self.canvas)
+        self._fit_height = fit_height
+
+        self._scrollregion_pending = False
+        self._configure_id = self.frame.bind("<Configure>", self._on_frame_configure)
+
+        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def _on_frame_configure(self, event):
+        if self._fit_height and event.height <= min(self._fit_height, self.frame.winfo_screenheight() - 100):
+            # Sin canvas ni barra tampoco hay recálculo de la región en cada <Configure>
+            self.frame.unbind("<Configure>", self._configure_id)
+            self.canvas.destroy()
+            self.scrollbar.destroy()
+            self.frame.pack(fill="both", expand=True)
+            return
+        if not self._scrollregion_pending:
+            self._scrollregion_pending = True
+            self.frame.after_idle(self._update_scrollregion)
+
+    def _update_scrollregion(self):
+        self._scrollregion_pending = False
+        if not self.canvas.winfo_exists():
+            return
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+
+class StatusLabel(ttk.Label):
+    """Etiqueta de estado: muestra un mensaje y lo borra pasado clear_ms.
+
+    Sirve para confirmar un guardado sin un diálogo modal.
+    """
+
+    def __init__(self, parent, clear_ms: int = 2000, **kwargs):
+        self._var = tk.StringVar()
+        super().__init__(parent, textvariable=self._var, anchor="w", **kwargs)
+        self._clear_ms = clear_ms
+        self._after_id = None
+
+    def show(self, text: str):
+        """Muestra text y reprograma el borrado."""
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        self._var.set(text)
+        self._after_id = self.after(self._clear_ms, self.clear)
+
+    def clear(self):
+        self._after_id = None
+        self._var.set("")
+
+    def destroy(self):
+        if self._after_id:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
+
+
+class TreeCellEditor:
+    """Editor de celdas de un Treeview: una sola entrada que se ubica sobre la celda editada.
+
+    keys son las claves editables en orden de tabulación, cell_of da la celda
+    (iid, columna) de cada clave y values el texto mostrado en cada una, que
+    el editor actualiza al confirmar. Tab/Return confirman y pasan a la celda
+    siguiente, Shift-Tab a la anterior y Escape descarta la edición.
+    on_change, si se da, se llama tras cada tecla y al confirmar o descartar.
+    """
+
+    def __init__(self, tree: ttk.Treeview, keys: Sequence[str],
+                 cell_of: Dict[str, Tuple[str, str]], values: Dict[str, str],
+                 on_change: Optional[Callable[[], None]] = None):
+        self.tree = tree
+        self._keys = tuple(keys)
+        self._position = {key: i for i, key in enumerate(self._keys)}
+        self._cell_of = cell_of
+        self._key_at = {cell: key for key, cell in cell_of.items()}
+        self._values = values
+        self._on_change = on_change
+        self._key: Optional[str] = None
+        self._original = ""
+
+        self._entry = ttk.Entry(tree, width=12)
+        if on_change:
+            self._entry.bind("<KeyRelease>", self._on_key)
+        for sequence in ("<Return>", "<KP_Enter>", "<Tab>"):
+            self._entry.bind(sequence, lambda e: self._commit_and_move(1))
+        # En X11 Shift-Tab llega como ISO_Left_Tab
+        for sequence in ("<Shift-Tab>", "<ISO_Left_Tab>"):
+            self._entry.bind(sequence, lambda e: self._commit_and_move(-1))
+        self._entry.bind("<FocusOut>", lambda e: self.commit())
+        self._entry.bind("<Escape>", lambda e: self.cancel())
+        tree.bind("<Double-1>", self._on_double_click)
+
+    def _on_double_click(self, event):
+        """Abre el editor sobre la celda editable pulsada."""
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return
+        iid = self.tree.identify_row(event.y)
+        column = self.tree.column(self.tree.identify_column(event.x), "id")
+        key = self._key_at.get((iid, column))
+        if key is not None:
+            self.begin(key)
+
+    def begin(self, key: str):
+        """Confirma la edición en curso y abre el editor sobre la celda de key."""
+        self.commit()
+        iid, column = self._cell_of[key]
+        self.tree.see(iid)
+        bbox = self.tree.bbox(iid, column)
+        if not bbox:
+            return
+        x, y, width, height = bbox
+        self._key = key
+        self._original = self._values[key]
+        self._entry.delete(0, "end")
+        self._entry.insert(0, self._original)
+        self._entry.select_range(0, "end")
+        self._entry.place(x=x, y=y, width=width, height=height)
+        self._entry.focus_set()
+
+    def _commit_and_move(self, step: int):
+        key = self._key
+        self.commit()
+        if key is not None:
+            position = self._position[key] + step
+            if 0 <= position < len(self._keys):
+                self.begin(self._keys[position])
+        # Evita el recorrido de foco por defecto de Tab
+        return "break"
+
+    def _on_key(self, event):
+        if self._key is not None:
+            self._values[self._key] = self._entry.get()
+            self._on_change()
+
+    def commit(self):
+        """Pasa el texto del editor a la celda y lo oculta."""
+        if self._key is None:
+            return
+        key, self._key = self._key, None
+        self._entry.place_forget()
+        self._set_value(key, self._entry.get())
+
+    def cancel(self):
+        """Descarta la edición en curso y devuelve la celda a su valor original."""
+        if self._key is None:
+            return
+        key, self._key = self._key, None
+        self._entry.place_forget()
+        self._set_value(key, self._original)
+
+    def _set_value(self, key: str, value: str):
+        self._values[key] = value
+        iid, column = self._cell_of[key]
+        self.tree.set(iid, column, value)
+        if self._on_change:
+            self._on_change()
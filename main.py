@@ -7,13 +7,13 @@ from pathlib import Path
 from typing import Dict, Tuple, Type, Optional
 import json
 from Interfaces.translations import tr
+from Interfaces.db import DB_FILE, DECISION_DDL, init_schema
 from Interfaces.investigacionmercado import MarketResearchUI
 from Interfaces.controlsistema import abrir_control_sistema
 from Interfaces.datosfisicosdeinventario import abrir_datos_fisicos_inventario
 from Interfaces.informacionadicionalbalance import abrir_informacion_adicional_balance
 from Interfaces.ventasporpais import abrir_ventas_por_pais
 from Interfaces.modelohome import abrir_modelo_home
-from Interfaces.modeloprofessional import abrir_modelo_professional
 from Interfaces.ventaspagadasperiodohome import abrir_ventas_pagadas_home
 from Interfaces.ventaspagadasperiodoprofessional import abrir_ventas_pagadas_professional
 from Interfaces.Consulta.listadoobservaciones import abrir_listado_observaciones
@@ -65,14 +65,7 @@ class CompanyModel:
                     reporting_currency_exchange_rate REAL NOT NULL DEFAULT 950.0
                 );
             """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS decision (
-                    company_id INTEGER NOT NULL,
-                    period INTEGER NOT NULL,
-                    payload TEXT NOT NULL,
-                    PRIMARY KEY (company_id, period)
-                );
-            """)
+            cursor.execute(DECISION_DDL.format(table="decision"))
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS financial_statement (
                     company_id INTEGER NOT NULL,
@@ -99,6 +92,8 @@ class CompanyModel:
                 );
             """)
             conn.commit()
+            # decision de bases anteriores pasa a tener product_type antes de abrir ventanas
+            init_schema(conn)
     
     def get_connection(self):
         conn = sqlite3.connect(self.db_file)
@@ -509,6 +504,10 @@ class MainMenu(tk.Tk):
         success, message = self.controller.create_company(company_name)
         
         if success:
+            # ProductUI guarda la lista de empresas en memoria
+            model = getattr(self, "business_game_model", None)
+            if model is not None:
+                model.invalidate_companies()
             messagebox.showinfo("Éxito", message)
             self.new_company_name_var.set("")
             self._populate_company_dropdown()
@@ -658,6 +657,7 @@ class MainMenu(tk.Tk):
         )
 
     def _open_modelo_professional(self):
+        from Interfaces.modeloprofessional import abrir_modelo_professional
         abrir_modelo_professional(
             self,
             self.current_company_id,
@@ -848,12 +848,14 @@ class MainMenu(tk.Tk):
     def _on_closing(self):
         """Maneja el cierre de la aplicación principal"""
         if messagebox.askokcancel("Salir", tr("exit_confirm")):
+            # Modelo compartido por las ventanas de productos durante la sesión
+            model = getattr(self, "business_game_model", None)
+            if model is not None:
+                model.close()
             self.destroy()
 
 # ------------------------- Punto de Entrada -------------------------
 if __name__ == "__main__":
-    DB_FILE = Path(__file__).parent/ "captop.db"
-    
     company_model = CompanyModel(DB_FILE)
     main_controller = MainController(company_model)
     